@@ -0,0 +1,10 @@
+"""
+Merge the per-task results journals into results.json.
+
+Safe to run while a crawl is in progress since journals are never modified.
+"""
+import config
+from utils.results_journal import compact_results
+
+total = compact_results(config.RESULTS_PATH, config.JOURNAL_PATH)
+print(f"Compacted {total} results into '{config.RESULTS_PATH}'.")
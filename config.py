@@ -1,16 +1,82 @@
+import tempfile
+
 # https://tranco-list.eu/list/KJ2GW/1000000
 CRAWL_NAME = f"KJ2GW"  # Name of crawl
 SITE_LIST_PATH = "inputs/sites/KJ2GW.txt"  # Path to list of sites to crawl
 DEPTH = 0
-WAIT_TIME = 5
+WAIT_TIME = 5  # Maximum time (seconds) to wait for a page to be ready
+
+PROBE = True  # Probe candidate URLs over plain HTTP before resolving a domain in a browser, see utils/probe.py
+PROBE_TIMEOUT = 15  # Seconds to wait for each candidate URL to answer the probe
+
+RESOLUTION_BLOCKED_RESOURCES = ("image", "media", "font")  # Resource types not fetched while resolving a domain, see interceptors.block_resource_interceptor
+
+READINESS = True  # Stop waiting once a page is stable (see Crawler.wait_until_ready). If False, always wait WAIT_TIME
+READY_QUIET_TIME = 0.5  # Seconds without DOM mutations or new requests before a page is stable
+READY_MIN_WAIT = 1  # Seconds to wait before the first check, so that a click can start navigating
+
+INSTALL_INJECTIONS = True  # Install injections once per page and only send a short call afterwards, see utils/injections.py
+MINIFY_INJECTIONS = False  # Strip comments and indentation from injections before sending them to the browser. Changes multi-line template literals, see utils/injections.minify
+CLICKABLE_AGENT = False  # Track clickable elements of a page incrementally between actions, see injections/clickable-agent.js. Off until validated against full scans
+# How clickstream generation chooses the next element, see Crawler.pop_candidate
+# "uniform": any clickable element. "interactable": prefer elements that are not disabled or covered by another element.
+# "weighted": as "interactable", and prefer elements in the viewport
+CLICK_WEIGHTING = "interactable"
+VIEWPORT_WEIGHT = 4  # How many times as likely an element in the viewport is chosen with "weighted"
 
 TOTAL_ACTIONS = 50
 CLICKSTREAM_LENGTH = 5
 
 DATA_PATH = f"/usr/project/xtmp/mml66/cookie-classify/{CRAWL_NAME}/"
 LOGGER_NAME = CRAWL_NAME
-RESULTS_PATH = DATA_PATH + "results.json"
-QUEUE_PATH = DATA_PATH + "queue.json"
+RESULTS_PATH = DATA_PATH + "results.json"  # Compacted results, see compact_results.py
+JOURNAL_PATH = DATA_PATH + "results/"  # Append-only results journal for each task
+QUEUE_PATH = DATA_PATH + "queue.db"
+QUEUE_JOURNAL_MODE = "DELETE"  # SQLite journal mode of the queue and resolution cache. "WAL" is faster, but only safe if every worker runs on the host storing DATA_PATH (not over NFS)
 CONFIG_PATH = DATA_PATH + "config.yaml"
+QUARANTINE_PATH = DATA_PATH + "quarantine/"  # Partial data of domains whose lease expired
+METRICS_PATH = DATA_PATH + "metrics/"  # Prometheus textfile of each task, see utils/metrics.py
+
+# Domain -> URL resolutions shared by all crawls, see utils/resolution_cache.py. If None, every domain is resolved
+RESOLUTION_CACHE_PATH = "/usr/project/xtmp/mml66/cookie-classify/resolutions.db"
+RESOLUTION_TTL = 30 * 24 * 60 * 60  # Seconds a resolved URL is reused
+NEGATIVE_RESOLUTION_TTL = 7 * 24 * 60 * 60  # Seconds a domain that does not exist or refuses connections is skipped, see Crawler.resolve_url
+
+LEASE_TIME = 10 * 60  # Seconds until a claimed domain is requeued without a heartbeat
+HEARTBEAT_INTERVAL = 60  # Seconds between heartbeats
+MAX_ATTEMPTS = 3  # Maximum number of expired leases before a domain is abandoned
+RETRY_BACKOFF = 15 * 60  # Base back-off in seconds, doubled after each expired lease
+
+WORKERS_PER_TASK = None  # Concurrent crawls per task. If None, derived from the SLURM allocation
+CPUS_PER_WORKER = 1
+MEMORY_PER_DRIVER = 3 * 1024 ** 3  # bytes of a web driver and its share of the worker. Workers run several with LOCKSTEP_ARMS and DRIVER_LOOKAHEAD
+TERMINATE_GRACE = 60  # Seconds after SIGTERM until a crawl is sent SIGKILL
+
+# Time budgets are learned from previous results, see utils/timeouts.py
+TIMEOUT = 60 * 60  # Seconds until a crawl is sent SIGTERM if there is not enough history
+MIN_TIMEOUT = 60  # Lower bound on every budget (seconds)
+MAX_TIMEOUT = 2 * 60 * 60  # Upper bound on every budget (seconds)
+# Directories (DATA_PATH, ending in '/') of earlier crawls, e.g., ["/usr/project/xtmp/mml66/cookie-classify/<CRAWL_NAME>/"]
+# sbatch_main.py orders the queue and seeds the resolution cache from their results, since this crawl has none yet
+PREVIOUS_CRAWLS: list[str] = []
+HISTORY_PATHS = PREVIOUS_CRAWLS + [DATA_PATH]  # Crawl directories to learn time budgets from, refit with this crawl's results as they arrive
+TIMEOUT_REFRESH = 30 * 60  # Seconds between refits of the timeout model
+MAX_PHASE_TIMEOUTS = 2  # Consecutive clickstreams exceeding their budget before a crawl is stopped
+
+# Template Firefox profile cloned for every web driver, see utils/firefox_profile.py
+# Should be on local disk, since every task on a machine reads it. If None, every web driver creates a fresh profile
+PROFILE_TEMPLATE_PATH = f"{tempfile.gettempdir()}/cookie-classify/{CRAWL_NAME}/profile/"
+DRIVER_POOL_SIZE = 1  # Idle web drivers kept warm for the next arm of a crawl
+DRIVER_MAX_USES = 10  # Arms crawled by a web driver before it is restarted
+RESET_IDLE_TIMEOUT = 5  # Seconds to wait for requests in flight to finish before the site data of a released web driver is cleared
+DRIVER_LOOKAHEAD = True  # Start the next web driver in the background while the current arm runs
+LOCKSTEP_ARMS = False  # Crawl the three arms of a clickstream concurrently, see Crawler.crawl_arms_lockstep
+PREWARM_WORKER = True  # Keep a spare worker with a started web driver ready for the next domain
+
+# Capture policy of the request storage of each web driver, see utils/capture.py. Headers, cookies, and timings are always kept
+HAR_BODY_MIME_TYPES = ()  # MIME types (or prefixes ending in '/', e.g., "text/") of kept request and response bodies
+HAR_MAX_BODY_SIZE = 64 * 1024  # Maximum size (bytes) of a kept body
+HAR_MEMORY_LIMIT = 32 * 1024 ** 2  # Bytes of HAR entries a web driver holds in memory before spilling them to disk
+REQUEST_STORAGE_MAX_SIZE = 1000  # Requests a web driver keeps in memory. The oldest are evicted, but their HAR entries are kept
 
 SLURM_LOG_PATH = "slurm_logs"
\ No newline at end of file
@@ -1,9 +1,12 @@
+import copy
 import functools
 from collections import deque
-from collections.abc import Callable
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from enum import Enum
 from pathlib import Path
-from typing import Optional, TypedDict, Any
+from typing import NamedTuple, Optional, TypedDict, Any
 import pathlib
 import time
 import shutil
@@ -11,6 +14,9 @@ import validators
 import json
 import logging
 import random
+import signal
+import os
+import threading
 
 import seleniumwire.request
 from seleniumwire import webdriver
@@ -36,6 +42,15 @@ import utils.interceptors as interceptors
 import utils.utils as utils
 from utils.utils import log
 from utils.url import URL
+from utils.timeouts import PhaseBudgets
+from utils.driver_pool import DriverPool
+from utils.lockstep import LockStep
+import utils.firefox_profile as firefox_profile
+import utils.probe as probe
+from utils.resolution_cache import ResolutionCache
+from utils.capture import CaptureStorage, CapturePolicy
+import utils.har as har
+import utils.injections as injections
 import config
 
 
@@ -51,7 +66,7 @@ class BannerClick(str, Enum):
 class ClickableElement(str, Enum):
     """
     Type of clickable element.
-    See clickable-elements.js for definitions.
+    See clickables.js for definitions.
     """
 
     BUTTON = "button"
@@ -60,6 +75,26 @@ class ClickableElement(str, Enum):
     POINTER = "pointer"
 
 
+class ClickCandidate(NamedTuple):
+    """
+    Clickable element on the current page.
+    See describeClickable in clickables.js for the metadata.
+    """
+
+    selector: str  # CSS selector
+    type: ClickableElement
+    in_viewport: bool  # Whether the element intersects the viewport
+    occluded: bool | None  # Whether another element covers the center of the element. None if unknown (e.g., outside the viewport)
+    disabled: bool
+    area: float  # Area (pixels) of the element
+
+    def likely_clickable(self) -> bool:
+        """
+        Return whether a click on the element is unlikely to be rejected or intercepted.
+        """
+        return not self.disabled and self.occluded is not True
+
+
 class CMP(str, Enum):
     """
     Type of CMP API.
@@ -83,6 +118,17 @@ class LandingPageDown(Exception):
     """
     pass
 
+class DomainUnreachable(LandingPageDown):
+    """
+    This exception is raised when no candidate URL of a domain answered the probe, and each
+    failed deterministically (e.g., the domain does not exist or refused the connection).
+    See Crawler.probe_domain.
+
+    Unlike other causes of LandingPageDown, retrying soon would not change the outcome,
+    so the domain is cached as down (see Crawler.resolve_url).
+    """
+    pass
+
 class UrlDown(Exception):
     """
     This exception is raised in self.get if the URL cannot be accessed.
@@ -91,6 +137,19 @@ class UrlDown(Exception):
     """
     pass
 
+class PhaseTimeout(BaseException):
+    """
+    This exception is raised when a phase of a crawl exceeds its time budget.
+    See Crawler.phase.
+
+    Like KeyboardInterrupt, it is raised asynchronously by a signal handler, so it derives from
+    BaseException to pass through the `except Exception` handlers of the code it interrupts.
+    """
+
+    def __init__(self, phase: str) -> None:
+        super().__init__(f"Phase '{phase}' exceeded its time budget.")
+        self.phase = phase
+
 class CrawlResults(TypedDict, total=False):
     """
     Class for storing results about a crawl.
@@ -104,6 +163,17 @@ class CrawlResults(TypedDict, total=False):
     SLURM_ARRAY_TASK_ID: int  # Set by main.py
     SIGTERM: bool  # If process was sent SIGTERM by main.py
     SIGKILL: bool  # If process was sent SIGKILL by main.py
+    phase_times: dict[str, list[float]]  # Duration (seconds) of each completed phase, see Crawler.phase
+    phase_timeouts: list[str]  # Phases that exceeded their time budget
+    attempts: int  # Number of previous claims of the domain whose lease expired, set by main.py
+    lease_expired: bool  # True iff the domain was abandoned after too many expired leases
+    resolution_cached: bool  # True iff the URL (or a down landing page) was read from the resolution cache
+    probed_urls: list[str]  # Candidate URLs that answered the probe before resolution, see Crawler.probe_domain
+    probe_outcomes: dict[str, str]  # Outcome of probing each candidate URL, see utils/probe.py
+    wait_times: list[float]  # Time (seconds) spent waiting for each page to be ready, see Crawler.wait_until_ready
+    driver_restarts: int  # Number of times the web driver was restarted after an error or timeout
+    driver_reset_failures: int  # Number of released web drivers that failed to reset and were quit, see DriverPool.release
+    resumed_actions: int  # Actions restored from a checkpoint of a previous crawl, see Crawler.load_checkpoint
 
     # Only set during compliance_algo
     cmp_names: set[CMP] | None  # Empty if no CMPs found, None if CMP detection not attempted
@@ -129,6 +199,50 @@ class CrawlDataEncoder(json.JSONEncoder):
         return super().default(obj)
 
 
+# Part of a page snapshot -> injection computing it (see utils/injections.py), see Crawler.snapshot
+SNAPSHOT_PARTS: dict[str, str] = {
+    "innerText": "inner-text.js",
+    "links": "links.js",
+    "img": "img.js",
+    "clickable": "clickable-agent.js" if config.CLICKABLE_AGENT else "clickable-elements.js",
+    "cmp": "cmp-detection.js",
+}
+FEATURE_PARTS = ("innerText", "links", "img")  # Parts used by Crawler.extract_features
+
+
+@functools.cache
+def register_snapshot(parts: tuple[str, ...]) -> str:
+    """
+    Register a script that runs the injections of the given snapshot parts and returns their results in one object.
+
+    Each injection runs in its own function, so their variables do not clash, and a failing
+    injection only sets its part to null. Error messages are returned under "errors".
+
+    Args:
+        parts: Parts of the snapshot, see SNAPSHOT_PARTS.
+
+    Returns:
+        Name of the script in the registry of utils/injections.py.
+    """
+    js = "const snapshot = {errors: {}};\n"
+    for part in parts:
+        body = injections.get_script(SNAPSHOT_PARTS[part])
+
+        js += (
+            f"try {{\n"
+            f"snapshot[{json.dumps(part)}] = (function () {{\n{body}\n}})();\n"
+            f"}} catch (e) {{\n"
+            f"snapshot[{json.dumps(part)}] = null;\n"
+            f"snapshot.errors[{json.dumps(part)}] = String(e);\n"
+            f"}}\n"
+        )
+
+    name = f"snapshot:{'+'.join(parts)}"
+    injections.register(name, js + "return snapshot;\n")
+
+    return name
+
+
 class Crawler:
     """
     Crawl websites, intercept requests, and take screenshots.
@@ -139,7 +253,7 @@ class Crawler:
 
     logger = logging.getLogger(config.LOGGER_NAME)
 
-    def __init__(self, domain: str, wait_time: int = 5, total_get_attempts: int = 3, page_load_timeout: int = 60, headless: bool = True) -> None:
+    def __init__(self, domain: str, wait_time: int = 5, total_get_attempts: int = 3, page_load_timeout: int = 60, headless: bool = True, phase_budgets: PhaseBudgets | None = None, pool: DriverPool | None = None) -> None:
         """
         Args:
             crawl_url: The URL of the website to crawl.
@@ -147,6 +261,8 @@ class Crawler:
             total_get_attempts: Number of attempts to get a website. Defaults to 3.
             page_load_timeout: Time to wait for a page to load. Defaults to 60 seconds.
             headless: Whether to run the web driver in headless mode. Defaults to True.
+            phase_budgets: Time budget for each phase of the crawl. Defaults to None, where phases are not limited.
+            pool: Pool of drivers started with the same headless and page_load_timeout. Defaults to None, where a new pool is created.
         """
         self.start_time = time.time()
 
@@ -155,15 +271,29 @@ class Crawler:
         self.headless = headless
         self.page_load_timeout = page_load_timeout
 
+        # Warm drivers reused across arms, see acquire_driver
+        self.pool = pool or Crawler.get_pool(headless, page_load_timeout)
+
+        # Guards files and results shared by arms running concurrently, see crawl_arms_lockstep
+        self.lock = threading.Lock()
+
         self.wait_time = wait_time
         self.total_get_attempts = total_get_attempts
 
+        self.phase_budgets: PhaseBudgets = phase_budgets or {}
+        self.deadlines: list[tuple[str, float | None]] = []  # Stack of (phase, deadline) for active phases
+
         self.domain = domain
         self.url: str # Must be resolved in a crawl_algo
 
         # Where the crawl data is stored
+        # The directory may only exist with a checkpoint, if a previous crawl of the domain was interrupted (see load_checkpoint)
+        # Otherwise, it holds the data of an earlier crawl, which must not be overwritten
         self.data_path = f"{config.DATA_PATH}{domain}/"
-        pathlib.Path(self.data_path).mkdir(parents=True, exist_ok=False)
+        self.checkpoint_path = self.data_path + "checkpoint.json"
+        if os.path.exists(self.data_path) and not os.path.exists(self.checkpoint_path):
+            raise FileExistsError(f"Data of a previous crawl of '{domain}' exists in '{self.data_path}'.")
+        pathlib.Path(self.data_path).mkdir(parents=True, exist_ok=True)
 
         # Each URL is assigned a unique ID
         self.uids: dict[Any, int] = {}
@@ -188,16 +318,32 @@ class Crawler:
                 ClickableElement.LINK: 0,
                 ClickableElement.ONCLICK: 0,
                 ClickableElement.POINTER: 0,
-            }
+            },
+
+            "phase_times": {
+                "resolution": [],
+                "clickstream": [],
+                "arm": [],
+            },
+            "phase_timeouts": [],
+            "wait_times": [],
+            "driver_restarts": 0,
+            "driver_reset_failures": 0,
+            "resumed_actions": 0,
         }
 
-    def get_driver(self, enable_har: bool = True) -> webdriver.Firefox:
+    @staticmethod
+    def get_driver(headless: bool = True, page_load_timeout: int = 60, enable_har: bool = True) -> webdriver.Firefox:
         """
-        Initialize and return a Firefox web driver using arguments from self.
+        Initialize and return a Firefox web driver.
+
+        A static method, so that drivers can be started before the domain of a crawl is known (see main.worker).
+        Requests are captured in memory under the capture policy of config.py (see utils/capture.py).
 
         Args:
+            headless: Whether to run the web driver in headless mode. Defaults to True.
+            page_load_timeout: Time to wait for a page to load. Defaults to 60 seconds.
             enable_har: Whether to enable HAR logging. Defaults to True.
-            disable_cookies: Whether to disable cookies. Defaults to False.
         """
         options = FirefoxOptions()
 
@@ -206,20 +352,212 @@ class Crawler:
         # options.add_argument('--disable-application-cache')
         # options.add_argument('--disable-gpu')
 
-        if self.headless:
+        if headless:
             options.add_argument("--headless")
 
+        # Allows scripts in the chrome context, which recent versions of Firefox refuse without it (see reset_driver)
+        options.add_argument("-remote-allow-system-access")
+
         seleniumwire_options = {
             'enable_har': enable_har,
+            'request_storage': 'memory',
+            'request_storage_max_size': config.REQUEST_STORAGE_MAX_SIZE,
         }
 
-        firefox_profile = webdriver.FirefoxProfile()  # by default, will create a fresh profile
-
-        driver = webdriver.Firefox(options=options, seleniumwire_options=seleniumwire_options, firefox_profile=firefox_profile)
-        driver.set_page_load_timeout(self.page_load_timeout)
+        if config.PROFILE_TEMPLATE_PATH is None:
+            profile = webdriver.FirefoxProfile()  # by default, will create a fresh profile
+            driver = webdriver.Firefox(options=options, seleniumwire_options=seleniumwire_options, firefox_profile=profile)
+        else:
+            # Start from a clone of the template profile, which is removed by DriverPool.quit
+            firefox_profile.build_template(config.PROFILE_TEMPLATE_PATH)
+            profile_path = firefox_profile.clone_profile(config.PROFILE_TEMPLATE_PATH)
+            options.add_argument("-profile")
+            options.add_argument(profile_path)
+            try:
+                driver = webdriver.Firefox(options=options, seleniumwire_options=seleniumwire_options)
+            except BaseException:
+                firefox_profile.remove_profile(profile_path)
+                raise
+            driver.profile_path = profile_path  # type: ignore[attr-defined]
+
+        driver.set_page_load_timeout(page_load_timeout)
+        CaptureStorage.install(driver, CapturePolicy(
+            config.HAR_BODY_MIME_TYPES,
+            config.HAR_MAX_BODY_SIZE,
+            config.HAR_MEMORY_LIMIT,
+        ))
 
         return driver
 
+    @staticmethod
+    def get_pool(headless: bool = True, page_load_timeout: int = 60) -> DriverPool:
+        """
+        Return a driver pool configured from config.py, see Crawler.get_driver for arguments.
+        """
+        arms = 3 if config.LOCKSTEP_ARMS else 1  # Arms running at the same time
+
+        return DriverPool(
+            functools.partial(Crawler.get_driver, headless=headless, page_load_timeout=page_load_timeout),
+            config.DRIVER_POOL_SIZE * arms,
+            config.DRIVER_MAX_USES,
+            config.DRIVER_LOOKAHEAD,
+        )
+
+    def save_checkpoint(self, current_actions: int) -> None:
+        """
+        Save the progress of classification_algo after a complete clickstream.
+
+        The checkpoint is replaced atomically, so an interrupted write never corrupts it.
+
+        Args:
+            current_actions: Number of actions collected so far.
+        """
+        checkpoint = {
+            "url": self.url,
+            "clickstream": self.results["clickstream"],
+            "traversal_failures": self.results["traversal_failures"],
+            "current_actions": current_actions,
+            "next_clickstream": self.clickstream + 1,
+        }
+
+        temp_path = self.checkpoint_path + ".tmp"
+        with open(temp_path, 'w') as file:
+            json.dump(checkpoint, file)
+        os.replace(temp_path, self.checkpoint_path)
+
+    def load_checkpoint(self) -> int:
+        """
+        Restore the progress of a previous crawl of the domain, see save_checkpoint.
+
+        If there is a checkpoint, clickstream directories that were not completed before the
+        previous crawl was interrupted are deleted, so the crawl continues after the last
+        complete clickstream. Without a checkpoint, nothing is deleted.
+
+        Returns:
+            Number of actions already collected. 0 if there is no checkpoint.
+        """
+        current_actions = 0
+        if os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path) as file:
+                checkpoint = json.load(file)
+
+            self.url = checkpoint["url"]
+            self.results["url"] = self.url
+            self.results["clickstream"] = [
+                [(selector, ClickableElement(type)) for selector, type in clickstream]
+                for clickstream in checkpoint["clickstream"]
+            ]
+            self.results["traversal_failures"] = {
+                ClickableElement(type): failures for type, failures in checkpoint["traversal_failures"].items()
+            }
+            self.clickstream = checkpoint["next_clickstream"]
+            current_actions = checkpoint["current_actions"]
+
+            for path in Path(self.data_path).iterdir():
+                if path.is_dir() and path.name.isdigit() and int(path.name) >= self.clickstream:
+                    Crawler.logger.info(f"Deleting incomplete clickstream '{path}'.")
+                    shutil.rmtree(path)
+
+        if current_actions > 0:
+            Crawler.logger.info(f"Resuming crawl for '{self.domain}' at clickstream {self.clickstream} with {current_actions} actions.")
+        self.results["resumed_actions"] = current_actions
+
+        return current_actions
+
+    def acquire_driver(self, enable_har: bool = True) -> None:
+        """
+        Set self.driver to a clean driver from the pool.
+
+        Args:
+            enable_har: Whether to enable HAR logging. Defaults to True.
+        """
+        self.driver = self.pool.acquire()
+        self.driver.backend.options["enable_har"] = enable_har
+
+    def block_resources(self, blocked: tuple[str, ...]) -> None:
+        """
+        Stop self.driver from fetching resources of the given types until it is released.
+
+        Only use this for sessions whose requests are not measured (e.g., resolving a domain),
+        since blocked resources change how a page loads.
+
+        Args:
+            blocked: Resource types to block, see interceptors.RESOURCE_DESTINATIONS. If empty, nothing is blocked.
+        """
+        if blocked:
+            self.driver.request_interceptor = functools.partial(interceptors.block_resource_interceptor, blocked=blocked)
+
+    def release_driver(self) -> None:
+        """
+        Reset self.driver and return it to the pool once a crawl is complete.
+        """
+        if not self.pool.release(self.driver):
+            with self.lock:
+                self.results["driver_reset_failures"] += 1
+
+    def quit_driver(self) -> None:
+        """
+        Quit self.driver without returning it to the pool (e.g., after a driver error).
+        """
+        if hasattr(self, "driver"):  # e.g., not started if a resumed crawl was already complete
+            self.pool.discard(self.driver)
+
+    def close(self) -> None:
+        """
+        Quit self.driver and all drivers in the pool.
+        """
+        self.quit_driver()
+        self.pool.close()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        Limit a block to the time budget of a phase using SIGALRM.
+
+        Phases may be nested. If any active phase exceeds its budget, PhaseTimeout is raised
+        for the outermost expired phase. The duration of each completed phase is recorded.
+
+        Args:
+            name: Name of the phase (see PhaseBudgets).
+
+        Raises:
+            PhaseTimeout: If the phase exceeds its time budget.
+        """
+        start = time.time()
+        budget = self.phase_budgets.get(name)
+
+        self.deadlines.append((name, start + budget if budget else None))
+        self.set_alarm()
+        try:
+            yield
+            self.results["phase_times"][name].append(time.time() - start)
+        finally:
+            self.deadlines.pop()
+            self.set_alarm()
+
+    def set_alarm(self) -> None:
+        """
+        Schedule SIGALRM for the earliest deadline of the active phases.
+        """
+        deadlines = [deadline for _, deadline in self.deadlines if deadline is not None]
+        if not deadlines:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            return
+
+        signal.signal(signal.SIGALRM, self.on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, max(min(deadlines) - time.time(), 0.001))
+
+    def on_alarm(self, *args) -> None:
+        """
+        SIGALRM handler that raises PhaseTimeout for the outermost expired phase.
+        """
+        for name, deadline in self.deadlines:
+            if deadline is not None and deadline <= time.time():
+                self.results["phase_timeouts"].append(name)
+                raise PhaseTimeout(name)
+
+        self.set_alarm()  # Woken up early
+
     @staticmethod
     def crawl_algo(func: Callable[..., None]) -> Callable[..., CrawlResults]:
         """
@@ -234,33 +572,120 @@ class Crawler:
             except LandingPageDown:
                 Crawler.logger.warning(f"Landing page is down for '{self.domain}'.")
                 self.results["landing_page_down"] = True
+            except PhaseTimeout as e:
+                Crawler.logger.warning(f"Stopping crawl for '{self.domain}'. {e}")
             except Exception:  # skipcq: PYL-W0703
                 Crawler.logger.critical(f"Unexpected exception for '{self.domain}'.", exc_info=True)
                 self.results["unexpected_exception"] = True
 
-            self.driver.quit()
+            self.close()
 
             return self.results
 
         return wrapper
 
-    def get_clickable_elements(self) -> list[tuple[str, str]]:
+    def get_clickable_elements(self, snapshot: dict[str, Any] | None = None) -> list[ClickCandidate]:
         """
         Get all clickable elements on the current page.
         
         If no clickable elements are found, return an empty list.
+
+        Args:
+            snapshot: Snapshot of the current page that includes the "clickable" part (see Crawler.snapshot).
+                Defaults to None, where the clickable elements are found with a separate injection.
         """
+        def to_candidates(els: list[list]) -> list[ClickCandidate]:
+            return [
+                ClickCandidate(selector, ClickableElement(type), meta["inViewport"], meta["occluded"], meta["disabled"], meta["area"])
+                for selector, type, meta in zip(*els)
+            ]
+
+        if snapshot is not None and snapshot.get("clickable") is not None:
+            return to_candidates(snapshot["clickable"])
+
         ATTEMPTS = 3
         for i in range(ATTEMPTS):
-            els = self.inject_script("injections/clickable-elements.js")
+            els = self.inject_script(SNAPSHOT_PARTS["clickable"])
             if els is not None:
-                return list(zip(*els))
+                return to_candidates(els)
 
             if i < ATTEMPTS - 1:
                 time.sleep(self.wait_time)
 
         return []
 
+    @staticmethod
+    def pop_candidate(candidates: list[ClickCandidate]) -> ClickCandidate:
+        """
+        Remove and return a random element to click next while generating a clickstream.
+
+        Unless `config.CLICK_WEIGHTING` is "uniform", elements that are likely to reject or
+        intercept the click (see ClickCandidate.likely_clickable) are only chosen once no other
+        elements remain. With "weighted", elements in the viewport are `config.VIEWPORT_WEIGHT`
+        times as likely to be chosen as other elements.
+
+        Args:
+            candidates: Clickable elements that were not tried yet. Must not be empty.
+        """
+        if config.CLICK_WEIGHTING == "uniform":
+            return candidates.pop(random.randrange(len(candidates)))
+
+        indices = [i for i, candidate in enumerate(candidates) if candidate.likely_clickable()] or list(range(len(candidates)))
+        if config.CLICK_WEIGHTING == "weighted":
+            weights = [config.VIEWPORT_WEIGHT if candidates[i].in_viewport else 1 for i in indices]
+            index = random.choices(indices, weights)[0]
+        else:
+            index = random.choice(indices)
+
+        return candidates.pop(index)
+
+    def wait_until_ready(self) -> float:
+        """
+        Wait until the current page is stable, for at most self.wait_time seconds.
+
+        A page is stable once it has loaded, its DOM has not changed for `config.READY_QUIET_TIME`
+        seconds, its layout did not change since the previous check, no finite animations are
+        running, and the proxy has not seen a new request for `config.READY_QUIET_TIME` seconds.
+
+        Returns:
+            Time (seconds) spent waiting, which is also recorded in self.results["wait_times"].
+        """
+        POLL_INTERVAL = 0.25
+
+        start = time.time()
+        if not config.READINESS:
+            time.sleep(self.wait_time)
+        else:
+            # Let a click start its navigation before the old page is checked
+            time.sleep(min(config.READY_MIN_WAIT, self.wait_time))
+            while time.time() - start < self.wait_time:
+                try:
+                    state = self.execute_injection("readiness.js")
+                    last_request = self.driver.last_request
+                except WebDriverException:  # e.g., the page is navigating
+                    state = None
+
+                if state is not None:
+                    network_idle = last_request is None or (
+                        last_request.response is not None
+                        and time.time() - last_request.date.timestamp() >= config.READY_QUIET_TIME
+                    )
+                    if (
+                        state["readyState"] == "complete"
+                        and state["quietFor"] >= config.READY_QUIET_TIME
+                        and state["layoutStable"]
+                        and state["animations"] == 0
+                        and network_idle
+                    ):
+                        break
+
+                time.sleep(min(POLL_INTERVAL, max(0, start + self.wait_time - time.time())))
+
+        duration = time.time() - start
+        self.results["wait_times"].append(duration)
+
+        return duration
+
     def get(self, url: str) -> str:
         """
         Get the website at the given URL with multiple reattempts.
@@ -279,7 +704,7 @@ class Crawler:
             try:
                 # Attempt to get the website
                 self.driver.get(url)
-                time.sleep(self.wait_time)
+                self.wait_until_ready()
                 break  # If successful, break out of the loop
 
             except TimeoutException:
@@ -294,20 +719,104 @@ class Crawler:
             raise UrlDown()
 
         # If there are no clickable elements, the website is down
-        selectors: list[tuple[str, str]] = self.get_clickable_elements()
+        selectors: list[ClickCandidate] = self.get_clickable_elements()
         if len(selectors) == 0:
             raise UrlDown()
         
         return self.driver.current_url
 
-    def resolve_domain(self, domain: str) -> str:
+    def probe_domain(self, domain: str) -> list[str]:
+        """
+        Return the candidate URLs of a domain that answer over plain HTTP, without a browser.
+
+        Args:
+            domain: The domain to probe.
+
+        Raises:
+            DomainUnreachable: If no candidate URL answers, and each failed deterministically.
+            LandingPageDown: If no candidate URL answers.
+        """
+        if not config.PROBE:
+            return probe.get_candidate_urls(domain)
+
+        outcomes = probe.probe_domain(domain, config.PROBE_TIMEOUT)
+        urls = [url for url, outcome in outcomes.items() if outcome == probe.Outcome.ANSWERED]
+        self.results["probe_outcomes"] = dict(outcomes)
+        self.results["probed_urls"] = urls
+        if not urls:
+            Crawler.logger.info(f"No URL of '{domain}' answered the probe ({', '.join(outcomes.values())}).")
+            if probe.unreachable(outcomes.values()):
+                raise DomainUnreachable()
+            raise LandingPageDown()
+
+        return urls
+
+    def resolve_url(self) -> str:
+        """
+        Resolve self.domain to a URL, using the resolution cache shared by all crawls if possible.
+
+        Only domains that are unreachable (see DomainUnreachable) are cached as down. Other causes
+        (e.g., a hanging page or a browser error) may be transient, so the domain is resolved again.
+        A cached URL is loaded to check that it is still up. If it is down, its entry is removed
+        and the domain is resolved again.
+
+        Raises:
+            LandingPageDown: If the landing page is down or was recently cached as down.
+        """
+        if config.RESOLUTION_CACHE_PATH is None:
+            urls = self.probe_domain(self.domain)
+            self.acquire_driver(enable_har=False)
+            self.block_resources(config.RESOLUTION_BLOCKED_RESOURCES)
+            url = self.resolve_domain(self.domain, urls)
+            self.release_driver()
+            return url
+
+        cache = ResolutionCache(config.RESOLUTION_CACHE_PATH, config.RESOLUTION_TTL, config.NEGATIVE_RESOLUTION_TTL, journal_mode=config.QUEUE_JOURNAL_MODE)
+        try:
+            cached = cache.get(self.domain)
+            if cached is not None and cached.url is None:
+                self.results["resolution_cached"] = True
+                Crawler.logger.info(f"Landing page of '{self.domain}' was recently down.")
+                raise LandingPageDown()
+
+            if cached is not None:
+                self.acquire_driver(enable_har=False)
+                self.block_resources(config.RESOLUTION_BLOCKED_RESOURCES)
+                try:
+                    url = self.resolve_domain(self.domain, [cached.url])
+                    self.release_driver()
+                    self.results["resolution_cached"] = True
+                    return url
+                except LandingPageDown:
+                    Crawler.logger.info(f"Cached URL '{cached.url}' of '{self.domain}' is down, resolving again.")
+                    cache.invalidate(self.domain, cached.url)
+                    self.release_driver()
+
+            try:
+                urls = self.probe_domain(self.domain)
+                self.acquire_driver(enable_har=False)
+                self.block_resources(config.RESOLUTION_BLOCKED_RESOURCES)
+                url = self.resolve_domain(self.domain, urls)
+                self.release_driver()
+            except DomainUnreachable:
+                if not self.results["phase_timeouts"]:
+                    cache.put(self.domain, None)
+                raise
+
+            cache.put(self.domain, url)
+            return url
+        finally:
+            cache.close()
+
+    def resolve_domain(self, domain: str, urls: list[str] | None = None) -> str:
         """
         Resolve a domain to a URL.
 
         Args:
             domain: The domain to resolve.
+            urls: Candidate URLs to try in order. Defaults to None, where all candidate URLs are tried.
         """
-        for url in [f"https://{domain}", f"https://www.{domain}", f"http://{domain}", f"http://www.{domain}"]:
+        for url in urls or probe.get_candidate_urls(domain):
             try:
                 return self.get(url)
             except UrlDown:
@@ -324,7 +833,7 @@ class Crawler:
         Args:
             depth: Number of layers of the DFS. Defaults to 0.
         """
-        self.driver = self.get_driver()
+        self.acquire_driver()
 
         # Uncomment for CMP Detection Only
         # self.crawl_inner_pages(
@@ -341,8 +850,8 @@ class Crawler:
         # Website Cookie Compliance Algorithm
         #
         if self.results["cmp_names"] and CMP.ONETRUST in self.results["cmp_names"]:
-            self.driver.quit()
-            self.driver = self.get_driver()
+            self.release_driver()
+            self.acquire_driver()
 
             #
             # OneTrust Compliance
@@ -375,8 +884,8 @@ class Crawler:
             return
 
         if self.results["interaction_success"]:  # able to BannerClick reject
-            self.driver.quit()
-            self.driver = self.get_driver()  # Reset driver
+            self.release_driver()
+            self.acquire_driver()  # Reset driver
 
             #
             # Accept/Reject Cookie Notices
@@ -419,61 +928,147 @@ class Crawler:
             length: Length of each clickstream. Defaults to 5.
         """
 
+        # Continue after the last complete clickstream of an interrupted crawl
+        current_actions = self.load_checkpoint()
+
         # Domain -> URL Resolution
-        self.driver = self.get_driver(enable_har=False)
-        self.url = self.resolve_domain(self.domain)
-        self.results["url"] = self.url
-        self.logger.info(f"Resolved domain '{self.domain}' to '{self.url}'.")
-        self.driver.quit()
+        if self.results["url"] is None:
+            with self.phase("resolution"):
+                self.url = self.resolve_url()
+                self.results["url"] = self.url
+                self.logger.info(f"Resolved domain '{self.domain}' to '{self.url}'.")
 
         # Classification Algorithm
-        current_actions = 0
+        consecutive_timeouts = 0
         while current_actions < total_actions:
             try:
-                clickstream_path = self.data_path + f"{self.clickstream}/"
-                Path(clickstream_path).mkdir(parents=True)
+                with self.phase("clickstream"):
+                    clickstream_path = self.data_path + f"{self.clickstream}/"
+                    Path(clickstream_path).mkdir(parents=True)
+
+                    if config.LOCKSTEP_ARMS:
+                        with self.phase("arm"):
+                            clickstream: list[tuple[str, ClickableElement]] = []
+                            control_clickstream = self.crawl_arms_lockstep(clickstream, clickstream_length)
+                            self.results["clickstream"].append(clickstream)  # Only complete clickstreams, as in the sequential path
+                            current_actions += len(control_clickstream) + 1 # We add one since we count just getting the website as an action
+                    else:
+                        with self.phase("arm"):
+                            self.acquire_driver()
+                            clickstream = self.crawl_clickstream(
+                                clickstream=None,
+                                clickstream_length=clickstream_length,
+                                crawl_name="baseline",
+                                set_request_interceptor=False,
+                            )
+                            self.save_har(clickstream_path + "baseline.har.gz")
+                            self.release_driver()
+
+                        self.results["clickstream"].append(clickstream)
+
+                        # Control group
+                        with self.phase("arm"):
+                            self.acquire_driver()
+                            control_clickstream = self.crawl_clickstream(
+                                clickstream=clickstream,
+                                clickstream_length=clickstream_length,
+                                crawl_name="control",
+                                set_request_interceptor=False,
+                            )
+                            current_actions += len(control_clickstream) + 1 # We add one since we count just getting the website as an action
+                            self.save_har(clickstream_path + "control.har.gz")
+                            self.release_driver()
+
+                        # Experimental group
+                        with self.phase("arm"):
+                            self.acquire_driver()
+                            self.crawl_clickstream(
+                                clickstream=clickstream,
+                                clickstream_length=clickstream_length, # No need to traverse more than the control group
+                                crawl_name="experimental",
+                                set_request_interceptor=True,
+                            )
+                            self.save_har(clickstream_path + "experimental.har.gz")
+                            self.release_driver()
+
+                    self.save_checkpoint(current_actions)
+
+                consecutive_timeouts = 0
+            except (InvalidSessionIdException, WebDriverException, JavascriptException, UnexpectedAlertPresentException) as e:
+                Crawler.logger.error(f"Driver encountered {type(e).__name__}. Restarting...", exc_info=True)
+                self.quit_driver()
+                self.results["driver_restarts"] += 1
+            except PhaseTimeout as e:
+                Crawler.logger.error(f"{e} Restarting...")
+                self.quit_driver()
+                self.results["driver_restarts"] += 1
+
+                # The website is likely hanging
+                consecutive_timeouts += 1
+                if consecutive_timeouts >= config.MAX_PHASE_TIMEOUTS:
+                    raise
+            finally:
+                Crawler.logger.info(f"Data collected for {current_actions}/{total_actions} actions.")
+                self.clickstream += 1
 
-                self.driver = self.get_driver()
-                clickstream = self.crawl_clickstream(
-                    clickstream=None,
-                    clickstream_length=clickstream_length,
-                    crawl_name="baseline",
-                    set_request_interceptor=False,
-                )
-                self.save_har(clickstream_path + "baseline.json")
-                self.driver.quit()
 
-                self.results["clickstream"].append(clickstream)
+    def crawl_arms_lockstep(self, clickstream: list[tuple[str, ClickableElement]], clickstream_length: int) -> list[tuple[str, ClickableElement]]:
+        """
+        Crawl the baseline, control, and experimental arms of a clickstream concurrently.
+
+        Each arm runs on its own thread with its own driver. The arms wait for each other
+        before each click and screenshot, so all arms see the website at the same time.
 
-                # Control group
-                self.driver = self.get_driver()
-                control_clickstream = self.crawl_clickstream(
-                    clickstream=clickstream,
+        Args:
+            clickstream: Empty list that is filled with the clickstream generated by the baseline.
+            clickstream_length: Maximum length of the clickstream.
+
+        Returns:
+            The clickstream traversed by the control group.
+        """
+        arms = {"baseline": False, "control": False, "experimental": True}  # crawl_name -> set_request_interceptor
+        lockstep = LockStep(len(arms))
+        clickstream_path = self.data_path + f"{self.clickstream}/"
+
+        crawlers: dict[str, Crawler] = {}
+        for crawl_name in arms:
+            crawlers[crawl_name] = copy.copy(self)  # Shares results, pool, and lock
+            crawlers[crawl_name].__dict__.pop("driver", None)
+
+        def crawl_arm(crawl_name: str) -> list[tuple[str, ClickableElement]]:
+            crawler = crawlers[crawl_name]
+            try:
+                crawler.acquire_driver()
+                traversed = crawler.crawl_clickstream(
+                    clickstream=None if crawl_name == "baseline" else clickstream,
                     clickstream_length=clickstream_length,
-                    crawl_name="control",
-                    set_request_interceptor=False,
-                )
-                current_actions += len(control_clickstream) + 1 # We add one since we count just getting the website as an action
-                self.save_har(clickstream_path + "control.json")
-                self.driver.quit()
-
-                # Experimental group
-                self.driver = self.get_driver()
-                self.crawl_clickstream(
-                    clickstream=clickstream,
-                    clickstream_length=clickstream_length, # No need to traverse more than the control group
-                    crawl_name="experimental",
-                    set_request_interceptor=True,
+                    crawl_name=crawl_name,
+                    set_request_interceptor=arms[crawl_name],
+                    lockstep=lockstep,
                 )
-                self.save_har(clickstream_path + "experimental.json")
-                self.driver.quit()
-            except (InvalidSessionIdException, WebDriverException, JavascriptException, UnexpectedAlertPresentException) as e:
-                Crawler.logger.error(f"Driver encountered {type(e).__name__}. Restarting...", exc_info=True)
-                self.driver.quit()
+                crawler.save_har(clickstream_path + f"{crawl_name}.har.gz")
+                crawler.release_driver()
+            except BaseException:
+                crawler.quit_driver()
+                raise
             finally:
-                Crawler.logger.info(f"Data collected for {current_actions}/{total_actions} actions.")
-                self.clickstream += 1
+                lockstep.leave()
 
+            return traversed
+
+        with ThreadPoolExecutor(max_workers=len(arms), thread_name_prefix="arm") as executor:
+            futures = {crawl_name: executor.submit(crawl_arm, crawl_name) for crawl_name in arms}
+            try:
+                # The baseline generates the clickstream in place, see crawl_clickstream
+                futures["baseline"].result()
+                futures["experimental"].result()
+                return futures["control"].result()
+            except BaseException:
+                # Unblock the other arms, e.g., after PhaseTimeout
+                lockstep.abort()
+                for crawler in crawlers.values():
+                    crawler.quit_driver()
+                raise
 
     @log
     def crawl_inner_pages(
@@ -583,16 +1178,13 @@ class Crawler:
                 continue
 
             # Wait for redirects and dynamic content
-            time.sleep(self.wait_time)
+            self.wait_until_ready()
 
             # Get domain and CMP name
             if current_depth == 0:
                 domain = utils.get_domain(self.driver.current_url)
 
-                with open("injections/cmp-detection.js", "r") as file:
-                    js = file.read()
-
-                cmp_names = [CMP(name) for name in self.driver.execute_script(js)]
+                cmp_names = [CMP(name) for name in self.snapshot(("cmp",))["cmp"] or []]
 
                 if self.results["cmp_names"] is None:
                     self.results["cmp_names"] = set(cmp_names)
@@ -649,11 +1241,8 @@ class Crawler:
                     if interaction_type == CMP.ONETRUST:
                         injection_script = "onetrust.js"
 
-                        with open(f"injections/{injection_script}", "r") as file:
-                            js = file.read()
-
                         try:
-                            result = self.driver.execute_script(js)
+                            result = self.execute_injection(injection_script)
                         except JavascriptException as e:
                             result = {"success": False, "message": e}
 
@@ -667,15 +1256,14 @@ class Crawler:
 
             # Save HAR file
             if crawl_name:
-                self.save_har(uid_data_path + f"{crawl_name}.json")
+                self.save_har(uid_data_path + f"{crawl_name}.har.gz")
 
             # Don't need to visit neighbors if we're at the maximum depth
             if current_depth == depth:
                 continue
 
-            # Find all the anchor elements (links) on the page
-            a_elements = self.driver.find_elements(By.TAG_NAME, 'a')
-            hrefs = [link.get_attribute('href') for link in a_elements]
+            # Find all links on the page in one round trip
+            hrefs = self.snapshot(("links",))["links"] or []
 
             # Visit neighbors
             for neighbor in hrefs:
@@ -699,6 +1287,7 @@ class Crawler:
             clickstream_length: int = 5,
             crawl_name: str = "",
             set_request_interceptor: bool = False,
+            lockstep: LockStep | None = None,
     ) -> list[tuple[str, ClickableElement]]:
         """
         Crawl website using clickstream.
@@ -709,6 +1298,8 @@ class Crawler:
             clickstream_length: Maximum length of the clickstream. Defaults to 5.
             crawl_name: Name of the crawl, used for file names. Defaults to "", where no files are created.
             set_request_interceptor: Whether to set the request interceptor. Defaults to False.
+            lockstep: Barrier shared with concurrent crawls, waited on before each click and screenshot.
+                When traversing a clickstream, it may still be generated by a concurrent crawl. Defaults to None.
 
         Returns:
             The clickstream that was generated/traversed.
@@ -719,6 +1310,10 @@ class Crawler:
         else:
             generate_clickstream = False
 
+        def sync() -> None:
+            if lockstep is not None:
+                lockstep.wait()
+
         clickstream_path = self.data_path + f"{self.clickstream}/"
 
         if set_request_interceptor:
@@ -737,14 +1332,20 @@ class Crawler:
 
         domain = utils.get_domain(self.url)
 
+        # Features and clickable elements of a page are collected in one snapshot
+        parts = (FEATURE_PARTS if crawl_name else ()) + (("clickable",) if generate_clickstream else ())
+
         self.driver.execute_script("window.scrollTo(0, 0);")
+        sync()
+        snapshot = self.snapshot(parts) if parts else {}
         if crawl_name:
-            self.extract_features(clickstream_path, crawl_name)
+            self.extract_features(clickstream_path, crawl_name, snapshot)
             self.save_screenshot(clickstream_path + f"{crawl_name}-0")
 
         # Clickstream execution loop
-        selectors: list[tuple[str, str]] = self.get_clickable_elements() if generate_clickstream else []
-        clickstream_length = clickstream_length if generate_clickstream else min(clickstream_length, len(clickstream))  # cannot exceed length of clickstream
+        selectors: list[ClickCandidate] = self.get_clickable_elements(snapshot) if generate_clickstream else []
+        if not generate_clickstream and lockstep is None:
+            clickstream_length = min(clickstream_length, len(clickstream))  # cannot exceed length of clickstream
         i = 0
         while i < clickstream_length:  # Note: we need a while loop here since we don't want to increment i if we fail to click
             # No more possible actions
@@ -754,10 +1355,13 @@ class Crawler:
 
             element_type = None
             if generate_clickstream:
-                # Randomly click on an element
-                action, _element_type = selectors.pop(random.randrange(len(selectors)))
-                element_type = ClickableElement(_element_type)
+                # Randomly click on an element, see config.CLICK_WEIGHTING
+                candidate = Crawler.pop_candidate(selectors)
+                action, element_type = candidate.selector, candidate.type
             else:
+                sync()  # Wait for the next action to be generated
+                if i >= len(clickstream):  # The generated clickstream is shorter
+                    return clickstream[:i]
                 action, element_type = clickstream[i]
 
             #
@@ -785,12 +1389,17 @@ class Crawler:
                     Crawler.logger.warning(f"Failed traversing clickstream {self.clickstream} ({crawl_name}) on action {i+1}/{clickstream_length}.")
 
                     if element_type is not None:
-                        self.results["traversal_failures"][element_type] += 1
+                        with self.lock:
+                            self.results["traversal_failures"][element_type] += 1
 
                     return clickstream[:i]
 
             Crawler.logger.info(f"Completed action {i+1}/{clickstream_length}.")
 
+            if generate_clickstream:
+                clickstream.append((action, element_type))
+                sync()  # Let the other crawls execute the action
+
             # Restrict within original domain
             if utils.get_domain(self.driver.current_url) != domain:
                 try:
@@ -800,15 +1409,16 @@ class Crawler:
 
             # Extract data
             self.driver.execute_script("window.scrollTo(0, 0);")
-            time.sleep(self.wait_time)
+            self.wait_until_ready()
+            sync()
+            snapshot = self.snapshot(parts) if parts else {}
             if crawl_name:
-                self.extract_features(clickstream_path, crawl_name)
+                self.extract_features(clickstream_path, crawl_name, snapshot)
                 self.save_screenshot(clickstream_path + f"{crawl_name}-{i+1}")
 
-            # Save action and generate new action
+            # Generate new action
             if generate_clickstream:
-                clickstream.append((action, element_type))
-                selectors = self.get_clickable_elements()
+                selectors = self.get_clickable_elements(snapshot)
             
             i += 1
 
@@ -816,23 +1426,76 @@ class Crawler:
 
         return clickstream
 
-    def inject_script(self, path: str) -> Any:
+    def execute_injection(self, name: str, *args: Any) -> Any:
         """
-        Inject a JavaScript file into the current page.
+        Run an injection on the current page without reattempts.
+
+        With `config.INSTALL_INJECTIONS`, the injection is installed as a function of the page on
+        its first call in each document, and later calls only send a short invocation.
+
+        Args:
+            name: Name of the injection, see utils/injections.py.
+            *args: Arguments of the injection, available as `arguments`.
         """
-        with open(path, "r") as file:
-            js = file.read()
+        if not config.INSTALL_INJECTIONS:
+            return self.driver.execute_script(injections.get_script(name), *args)
+
+        result = self.driver.execute_script(injections.invoke_script(name), *args)
+        if result == injections.MISSING:
+            result = self.driver.execute_script(injections.install_script(name), *args)
 
+        return result
+
+    def inject_script(self, name: str) -> Any:
+        """
+        Inject a JavaScript file into the current page.
+
+        Args:
+            name: Name of the injection, see utils/injections.py.
+        """
         ATTEMPTS = 3
         for i in range(ATTEMPTS):
             try:
-                return self.driver.execute_script(js)
+                return self.execute_injection(name)
             except JavascriptException:
-                Crawler.logger.warning(f"Failed to inject '{path}'. Attempt {i+1}/{ATTEMPTS}.")
+                Crawler.logger.warning(f"Failed to inject '{name}'. Attempt {i+1}/{ATTEMPTS}.")
             
             if i < ATTEMPTS - 1:
                 time.sleep(self.wait_time)
-        raise JavascriptException(f"Failed to inject '{path}' after {ATTEMPTS} attempts.")
+        raise JavascriptException(f"Failed to inject '{name}' after {ATTEMPTS} attempts.")
+
+    def snapshot(self, parts: tuple[str, ...] = tuple(SNAPSHOT_PARTS)) -> dict[str, Any]:
+        """
+        Collect the results of several injections on the current page in a single round trip.
+
+        Parts whose injection failed (e.g., innerText while the body is still loading) are taken
+        again in another round trip, so a failed part is never mistaken for an empty result.
+
+        Args:
+            parts: Parts of the snapshot, see SNAPSHOT_PARTS. Defaults to all parts.
+
+        Raises:
+            JavascriptException: If a part still fails after all attempts.
+
+        Returns:
+            The result of each part.
+        """
+        ATTEMPTS = 3
+        snapshot: dict[str, Any] = {}
+        for i in range(ATTEMPTS):
+            result = self.inject_script(register_snapshot(parts))
+            errors = result.pop("errors", {})
+            snapshot.update(result)
+            if not errors:
+                return snapshot
+
+            for part, error in errors.items():
+                Crawler.logger.warning(f"Failed to take snapshot part '{part}': {error} Attempt {i+1}/{ATTEMPTS}.")
+            parts = tuple(part for part in parts if part in errors)
+
+            if i < ATTEMPTS - 1:
+                time.sleep(self.wait_time)
+        raise JavascriptException(f"Failed to take snapshot parts {list(parts)} after {ATTEMPTS} attempts.")
 
     def save_screenshot(self, file_name: str, full_page: bool = False) -> None:
         """
@@ -864,13 +1527,15 @@ class Crawler:
                     if i < ATTEMPTS - 1:
                         time.sleep(self.wait_time)
 
-    def extract_features(self, path: pathlib.Path | str, crawl_name: str) -> None:
+    def extract_features(self, path: pathlib.Path | str, crawl_name: str, snapshot: dict[str, Any] | None = None) -> None:
         """
         Extract features from the current page and save them to a file.
 
         Args:
             path: Directory to save the content.
             crawl_name: Name of the crawl (e.g., "baseline", "control", "experimental") used for file names.
+            snapshot: Snapshot of the current page that includes FEATURE_PARTS (see Crawler.snapshot).
+                Defaults to None, where a snapshot is taken.
         """
         def extract_word_counts(innerText: str | None) -> dict:
             """
@@ -915,46 +1580,50 @@ class Crawler:
 
         data_path = path / "features.json"
 
+        if snapshot is None or any(part not in snapshot for part in FEATURE_PARTS):
+            snapshot = self.snapshot(FEATURE_PARTS)
+
         content = {
-            "innerText": extract_word_counts(self.inject_script("injections/inner-text.js")),
-            "links": count_list_items(self.inject_script("injections/links.js")),
-            "img": count_list_items(self.inject_script("injections/img.js")),
+            "innerText": extract_word_counts(snapshot["innerText"]),
+            "links": count_list_items(snapshot["links"]),
+            "img": count_list_items(snapshot["img"]),
         }
 
-        if (data_path).exists():
-            with open(data_path, "r") as file:
-                data = json.load(file)
-        else:
-            data = {}
+        with self.lock:  # Concurrent arms share features.json
+            if (data_path).exists():
+                with open(data_path, "r") as file:
+                    data = json.load(file)
+            else:
+                data = {}
 
-        for name, extract in content.items():
-            if name not in data:
-                data[name] = {}
-            if crawl_name not in data[name]:
-                data[name][crawl_name] = []
+            for name, extract in content.items():
+                if name not in data:
+                    data[name] = {}
+                if crawl_name not in data[name]:
+                    data[name][crawl_name] = []
 
-            data[name][crawl_name].append(extract)
+                data[name][crawl_name].append(extract)
 
-        with open(data_path, 'w') as file:
-            json.dump(data, file)
+            with open(data_path, 'w') as file:
+                json.dump(data, file)
 
     def save_har(self, file_path: str) -> None:
         """
         Save current HAR file to file_path.
 
+        Entries are streamed from the request storage of the driver (see utils/capture.py)
+        to the file, see utils/har.py. Read the file with `har.iter_har_entries`.
+
         NOTE: Requests continually get logged to the same HAR file.
         To start logging a new HAR file, use: 'del self.driver.requests'.
 
         Args:
-            file_path: Path to save the HAR file. The file extension should be '.json'.
+            file_path: Path to save the HAR file. The file extension should be '.har.gz' (or '.har' to skip compression).
         """
-        if not file_path.lower().endswith(".json"):
-            raise ValueError("File extension must be `.json`.")
-
-        data = json.loads(self.driver.har)
+        if not file_path.lower().endswith((".har.gz", ".har")):
+            raise ValueError("File extension must be `.har.gz` or `.har`.")
 
-        with open(file_path, 'w') as file:
-            json.dump(data, file, indent=4)
+        har.write_har(file_path, self.driver.backend.storage.iter_har_entries())
 
     def back(self) -> None:
         """
@@ -968,6 +1637,6 @@ class Crawler:
 
     def __repr__(self) -> str:
         """
-        Return crawl_url in logs.
+        Return crawl_url in logs, or the domain until it is resolved.
         """
-        return self.url
+        return getattr(self, "url", self.domain)
@@ -7,10 +7,11 @@ from pathlib import Path
 import yaml
 import matplotlib.pyplot as plt
 import matplotlib as mpl
-from filelock import FileLock
 from crawler import CrawlResults
-from utils.utils import get_directories, get_domain, split
+from utils.utils import get_directories, get_domain
 from utils.image_shingle import ImageShingle
+from utils.domain_queue import Claim, open_array_queue, read_domains, report_abandoned
+from utils.results_journal import load_results
 import time
 import numpy as np
 
@@ -31,16 +32,10 @@ with open(config["SITE_LIST_PATH"]) as file:
         site_list.append(line.strip())
 
 # Site queue
-queue_lock = FileLock(config["QUEUE_PATH"] + '.lock', timeout=60)
-with queue_lock:
-    with open(config["QUEUE_PATH"], 'r') as file:
-        site_queue = json.load(file)
+site_queue = read_domains(config["QUEUE_PATH"])
 
 # Site results
-results_lock = FileLock(config["RESULTS_PATH"] + '.lock', timeout=60)
-with results_lock:
-    with open(config["RESULTS_PATH"]) as file:
-        site_results: dict[str, CrawlResults] = json.load(file)
+site_results: dict[str, CrawlResults] = load_results(config["RESULTS_PATH"], config.get("JOURNAL_PATH"))  # type: ignore
 
 """
 Check crawl completion.
@@ -79,12 +74,23 @@ log_stream.setLevel(logging.DEBUG)
 log_stream.setFormatter(formatter)
 logger.addHandler(log_stream)
 
-array = list(split(successful_sites, 25))
 try:
     SLURM_ARRAY_TASK_ID = int(os.getenv('SLURM_ARRAY_TASK_ID')) # type: ignore
 except Exception:
     SLURM_ARRAY_TASK_ID = 0
 
+"""
+All array tasks pull domains from a shared work queue, longest first.
+The cost of a domain is the number of screenshots taken per arm.
+"""
+LEASE_TIME = 60 * 60  # Seconds a domain may take before it is requeued. Leases of unsaved domains are renewed after each domain
+FLUSH_INTERVAL = 10 * 60  # Seconds between saving results and completing claims
+
+work_queue, owner = open_array_queue(str(ANALYSIS_PATH / "slurm/differences"), successful_sites, costs={
+    domain: sum(len(clickstream) + 1 for clickstream in site_results[domain].get("clickstream", []))
+    for domain in successful_sites
+}, task_id=SLURM_ARRAY_TASK_ID)
+
 def jaccard_distance(dict1, dict2):
     """
     Computes the Jaccard difference between two frequency dictionaries.
@@ -233,10 +239,34 @@ def extract_differences(sites: list) -> dict:
 
     return res
 
+def save(res: dict, claims: list[Claim]) -> None:
+    """
+    Save the dictionary to a JSON file and complete the claims of all saved domains.
+
+    Nothing is written if no domain was claimed since the last save, so a task that claims
+    no domain never replaces the results of a previous run with empty results.
+    """
+    if not claims:
+        return
+
+    with open(ANALYSIS_PATH / f"slurm/differences/{SLURM_ARRAY_TASK_ID}.json", 'w') as f:
+        json.dump(res, f)
+
+    for claim in claims:
+        work_queue.complete(claim, owner)
+    claims.clear()
+
 start_time = time.time()
-res = extract_differences(array[SLURM_ARRAY_TASK_ID])
-# Save the dictionary to a JSON file
-with open(ANALYSIS_PATH / f"slurm/differences/{SLURM_ARRAY_TASK_ID}.json", 'w') as f:
-    json.dump(res, f)
-print(f"Completed in {time.time() - start_time} seconds.")
+res: dict = {}
+claims: list[Claim] = []
+last_flush = time.time()
+for claim in work_queue.claim_all(owner, LEASE_TIME, on_wait=lambda: save(res, claims), on_abandoned=report_abandoned):
+    res.update(extract_differences([claim.domain]))
+    claims.append(claim)
+
+    if time.time() - last_flush >= FLUSH_INTERVAL:
+        save(res, claims)
+        last_flush = time.time()
+save(res, claims)
+print(f"Completed {len(res)} sites in {time.time() - start_time} seconds.")
 
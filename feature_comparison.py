@@ -6,10 +6,11 @@ from pathlib import Path
 import yaml
 import matplotlib.pyplot as plt
 import matplotlib as mpl
-from filelock import FileLock
 from crawler import CrawlResults
-from utils.utils import get_directories, get_domain, split
+from utils.utils import get_directories, get_domain
 from utils.image_shingle import ImageShingle
+from utils.domain_queue import Claim, open_array_queue, read_domains, report_abandoned
+from utils.results_journal import load_results
 import time
 import numpy as np
 
@@ -31,16 +32,10 @@ with open(config["SITE_LIST_PATH"]) as file:
         site_list.append(line.strip())
 
 # Site queue
-queue_lock = FileLock(config["QUEUE_PATH"] + '.lock', timeout=10)
-with queue_lock:
-    with open(config["QUEUE_PATH"], 'r') as file:
-        site_queue = json.load(file)
+site_queue = read_domains(config["QUEUE_PATH"])
 
 # Site results
-results_lock = FileLock(config["RESULTS_PATH"] + '.lock', timeout=10)
-with results_lock:
-    with open(config["RESULTS_PATH"]) as file:
-        site_results: dict[str, CrawlResults] = json.load(file)
+site_results: dict[str, CrawlResults] = load_results(config["RESULTS_PATH"], config.get("JOURNAL_PATH"))  # type: ignore
 
 """
 Check crawl completion.
@@ -69,12 +64,23 @@ print(keys)
 
 ##############################################################################
 
-array = list(split(successful_sites, 25))
 try:
     SLURM_ARRAY_TASK_ID = int(os.getenv('SLURM_ARRAY_TASK_ID')) # type: ignore
 except Exception:
     SLURM_ARRAY_TASK_ID = 0
 
+"""
+All array tasks pull domains from a shared work queue, longest first.
+The cost of a domain is the number of screenshots taken per arm.
+"""
+LEASE_TIME = 60 * 60  # Seconds a domain may take before it is requeued. Leases of unsaved domains are renewed after each domain
+FLUSH_INTERVAL = 10 * 60  # Seconds between saving results and completing claims
+
+work_queue, owner = open_array_queue(str(ANALYSIS_PATH / "slurm/features"), successful_sites, costs={
+    domain: sum(len(clickstream) + 1 for clickstream in site_results[domain].get("clickstream", []))
+    for domain in successful_sites
+}, task_id=SLURM_ARRAY_TASK_ID)
+
 def compare_features(sites, feature: str, comparison: tuple[str, str]) -> pd.DataFrame:
     """
     Compute difference in difference of features.
@@ -126,8 +132,37 @@ def merge_experiments(sites, feature: str):
     df["diff_in_diff"] = df["experimental_diff"] - df["control_diff"]
     return df
 
+FEATURES = ["innerText", "links", "img"]
+
+def save(dfs: dict[str, list[pd.DataFrame]], claims: list[Claim]) -> None:
+    """
+    Save the comparison of each feature to a CSV file and complete the claims of all saved domains.
+
+    Nothing is written if no domain was claimed since the last save, so a task that claims
+    no domain never replaces the results of a previous run with empty results.
+    """
+    if not claims:
+        return
+
+    for feature in FEATURES:
+        df = pd.concat(dfs[feature], ignore_index=True) if dfs[feature] else pd.DataFrame()
+        df.to_csv(ANALYSIS_PATH / f"slurm/{feature}/{SLURM_ARRAY_TASK_ID}.csv", index=False)
+
+    for claim in claims:
+        work_queue.complete(claim, owner)
+    claims.clear()
+
 start_time = time.time()
-for feature in ["innerText", "links", "img"]:
-    df = merge_experiments(array[SLURM_ARRAY_TASK_ID], feature)
-    df.to_csv(ANALYSIS_PATH / f"slurm/{feature}/{SLURM_ARRAY_TASK_ID}.csv", index=False)
+dfs: dict[str, list[pd.DataFrame]] = {feature: [] for feature in FEATURES}
+claims: list[Claim] = []
+last_flush = time.time()
+for claim in work_queue.claim_all(owner, LEASE_TIME, on_wait=lambda: save(dfs, claims), on_abandoned=report_abandoned):
+    for feature in FEATURES:
+        dfs[feature].append(merge_experiments([claim.domain], feature))
+    claims.append(claim)
+
+    if time.time() - last_flush >= FLUSH_INTERVAL:
+        save(dfs, claims)
+        last_flush = time.time()
+save(dfs, claims)
 print(f"Completed in {time.time() - start_time} seconds.")
\ No newline at end of file
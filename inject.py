@@ -1,6 +1,6 @@
+import argparse
 import config
-import json
-from filelock import FileLock
+from utils.domain_queue import DomainQueue, Priority
 
 SITES_TO_INJECT = [
     "arstechnica.com",
@@ -9,6 +9,15 @@ SITES_TO_INJECT = [
     "engadget.com",
     "safety.google"
 ]
+
+parser = argparse.ArgumentParser()
+parser.add_argument(
+    "--urgent",
+    action="store_true",
+    help="Crawl the injected sites before all other queued sites.",
+)
+args = parser.parse_args()
+
 print(SITES_TO_INJECT)
 print(len(set(SITES_TO_INJECT)))
 
@@ -22,16 +31,8 @@ if (
     exit(0)
 
 
-queue_lock = FileLock(config.QUEUE_PATH + ".lock", timeout=10)
-
-with queue_lock:
-    with open(config.QUEUE_PATH, "r") as file:
-        sites = json.load(file)
-
-    sites.extend(SITES_TO_INJECT)
-    # sites[:0] = SITES_TO_INJECT
-
-    with open(config.QUEUE_PATH, "w") as file:
-        json.dump(sites, file)
+queue = DomainQueue(config.QUEUE_PATH, journal_mode=config.QUEUE_JOURNAL_MODE)
+queue.put(SITES_TO_INJECT, priority=Priority.URGENT if args.urgent else Priority.NORMAL)
+queue.close()
 
 print("Injection complete.")
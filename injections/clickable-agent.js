@@ -0,0 +1,122 @@
+/**
+ * Return CSS selectors, types, and click metadata for clickable elements, like clickable-elements.js, but incrementally.
+ *
+ * On the first call for each document, the clickable elements are found with a full scan and a
+ * MutationObserver is installed as `window.__ccAgent`. Later calls only rescan the subtrees that
+ * changed since the previous call, and only generate selectors for new elements or for elements
+ * that their cached selector no longer selects. The metadata is computed on every call.
+ *
+ * Layout changes that do not mutate the DOM (e.g., loaded images and stylesheets, a resized
+ * window, or a scrolled container) can change which elements are clickable, so they trigger
+ * a full scan on the next call.
+ *
+ * @requires finder.js
+ * @requires clickables.js
+ * @returns {string[], string[], Object[]} CSS selectors, types, metadata (see describeClickable) for clickable elements.
+ */
+
+const MAX_CHANGED = 1000; // Changed subtrees above which a full scan is cheaper
+
+var agent = window.__ccAgent;
+if (agent === undefined) {
+    agent = window.__ccAgent = {
+        elements: new Map(), // Element -> {type, selector}
+        changed: new Set(), // Roots of subtrees that changed since the previous call
+        full: true, // Whether the next call must scan the whole document
+    };
+    new MutationObserver(function (mutations) {
+        if (agent.full) {
+            return;
+        }
+        for (const mutation of mutations) {
+            // Added and removed nodes are children of the target. An attribute (e.g., class or style)
+            // may change the visibility and cursor of the target and all of its descendants.
+            agent.changed.add(mutation.target);
+        }
+        if (agent.changed.size > MAX_CHANGED) {
+            agent.full = true;
+            agent.changed.clear();
+        }
+    }).observe(document, { childList: true, subtree: true, attributes: true });
+
+    function rescan() {
+        agent.full = true;
+        agent.changed.clear();
+    }
+    // Captured, since load events of resources and scroll events of elements do not bubble
+    for (const type of ["load", "resize", "scroll"]) {
+        window.addEventListener(type, rescan, { capture: true, passive: true });
+    }
+}
+
+function add(items, previous) {
+    for (const item of items) {
+        const entry = previous.get(item.element);
+        agent.elements.set(item.element, { type: item.type, selector: entry ? entry.selector : null });
+    }
+}
+
+if (!agent.full) {
+    // Rescan each changed subtree once, skipping subtrees inside another changed subtree
+    for (const root of agent.changed) {
+        if (root.nodeType !== Node.ELEMENT_NODE) {
+            agent.full = true; // e.g., the document element was replaced
+            break;
+        }
+        if (!root.isConnected) {
+            continue; // Its elements are dropped below
+        }
+
+        let nested = false;
+        for (let ancestor = root.parentElement; ancestor !== null; ancestor = ancestor.parentElement) {
+            if (agent.changed.has(ancestor)) {
+                nested = true;
+                break;
+            }
+        }
+        if (nested) {
+            continue;
+        }
+
+        // Keep the selectors of elements that are still clickable
+        const previous = new Map();
+        for (const element of [root, ...root.getElementsByTagName("*")]) {
+            if (agent.elements.has(element)) {
+                previous.set(element, agent.elements.get(element));
+                agent.elements.delete(element);
+            }
+        }
+        add(findClickables(root), previous);
+    }
+}
+agent.changed.clear();
+
+if (agent.full) {
+    agent.elements = new Map();
+    add(findClickables(document.documentElement), new Map());
+    agent.full = false;
+}
+
+const selectors = [];
+const types = [];
+const metadata = [];
+for (const [element, entry] of agent.elements) {
+    if (!element.isConnected) {
+        agent.elements.delete(element); // Removed from the document
+        continue;
+    }
+
+    try {
+        // A cached selector may select another element after the DOM changed
+        if (entry.selector === null || document.querySelector(entry.selector) !== element) {
+            entry.selector = finder(element);
+        }
+        const meta = describeClickable(element)
+        selectors.push(entry.selector)
+        types.push(entry.type)
+        metadata.push(meta)
+    }
+    catch (e) { }
+}
+
+return [selectors, types, metadata]
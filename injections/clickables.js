@@ -0,0 +1,111 @@
+/**
+ * Clickable element discovery. Defines `findClickables(root)` and `describeClickable(element)`.
+ * Include in another injection with `@requires clickables.js`.
+ * 
+ * Clickable elements have the following types:
+ * - "button": <button> elements
+ * - "link": <a> elements
+ * - "onclick": Elements with an onclick attribute
+ * - "pointer": Elements with a pointer cursor style
+ * The first matching type is used. (Types get more general from top to bottom.)
+ * 
+ * The DOM is walked once with a TreeWalker and the style of each element is computed once.
+ * Elements that are not rendered are skipped, along with their subtrees if none of their
+ * descendants can be rendered either (display: none).
+ * 
+ * Adapted from: https://gist.github.com/iiLaurens/81b1b47f6259485c93ce6f0cdd17490a
+ */
+
+/**
+ * Return the clickable type of an element, or null if it is not clickable.
+ * Tag and onclick checks come first, so the computed cursor is only read if they do not match.
+ */
+function determineType(element, style) {
+    if (element.tagName === "BUTTON") {
+        return "button";
+    }
+    if (element.tagName === "A") {
+        return "link";
+    }
+    if (element.onclick != null) {
+        return "onclick";
+    }
+    if (style.cursor == "pointer") {
+        return "pointer";
+    }
+    return null; // In case none of the conditions match
+}
+
+/**
+ * Return the rendered clickable elements of a subtree, including its root.
+ * @param {Element} root Root of the subtree.
+ * @returns {{element: Element, type: string}[]} Clickable elements in document order.
+ */
+function findClickables(root) {
+    const items = [];
+
+    function visit(element) {
+        const style = window.getComputedStyle(element);
+        if (style.display === "none") {
+            return NodeFilter.FILTER_REJECT; // No descendant is rendered
+        }
+
+        if (style.display !== "contents") {
+            const rect = element.getBoundingClientRect();
+            if (rect.width === 0 || rect.height === 0) {
+                // Descendants may overflow the empty box. Even if it clips its overflow,
+                // fixed or absolutely positioned descendants may escape the clip
+                return NodeFilter.FILTER_SKIP;
+            }
+        }
+
+        if (style.visibility !== "visible") {
+            return NodeFilter.FILTER_SKIP; // Descendants may be visible
+        }
+
+        const type = determineType(element, style);
+        if (type !== null) {
+            items.push({ element: element, type: type });
+        }
+        return NodeFilter.FILTER_SKIP;
+    }
+
+    if (visit(root) !== NodeFilter.FILTER_REJECT) {
+        const walker = document.createTreeWalker(root, NodeFilter.SHOW_ELEMENT, { acceptNode: visit });
+        while (walker.nextNode()) { } // Every element is handled by visit
+    }
+
+    return items;
+}
+
+/**
+ * Describe how likely a click on an element is to succeed.
+ * @param {Element} element A clickable element.
+ * @returns {{inViewport: boolean, occluded: boolean|null, disabled: boolean, area: number}}
+ *     Whether the element intersects the viewport, whether another element is on top of its
+ *     center (null if unknown, e.g., outside the viewport), whether it is disabled, and its area in pixels.
+ */
+function describeClickable(element) {
+    const rect = element.getBoundingClientRect();
+    const width = window.innerWidth;
+    const height = window.innerHeight;
+    const inViewport = rect.bottom > 0 && rect.right > 0 && rect.top < height && rect.left < width;
+
+    let occluded = null;
+    if (inViewport) {
+        // Center of the visible part of the element
+        const x = (Math.max(rect.left, 0) + Math.min(rect.right, width)) / 2;
+        const y = (Math.max(rect.top, 0) + Math.min(rect.bottom, height)) / 2;
+        const hit = document.elementFromPoint(x, y);
+        if (hit !== null) {
+            occluded = !(hit === element || element.contains(hit));
+        }
+    }
+
+    return {
+        inViewport: inViewport,
+        occluded: occluded,
+        disabled: element.matches(":disabled") || element.getAttribute("aria-disabled") === "true",
+        area: rect.width * rect.height,
+    };
+}
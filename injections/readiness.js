@@ -0,0 +1,36 @@
+/**
+ * Report signals of page stability. See Crawler.wait_until_ready.
+ * A MutationObserver is installed on the first call for each document.
+ * @returns {{readyState: string, quietFor: number, animations: number, layoutStable: boolean}}
+ */
+
+var state = window.__ccReadiness;
+if (state === undefined) {
+    state = window.__ccReadiness = {lastMutation: performance.now(), layout: null};
+    new MutationObserver(function () {
+        state.lastMutation = performance.now();
+    }).observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+}
+
+// Layout is stable if the size of the page and the number of elements did not change since the last call
+var root = document.documentElement;
+var layout = root ? [root.scrollWidth, root.scrollHeight, document.getElementsByTagName("*").length].join() : "";
+var layoutStable = layout === state.layout;
+state.layout = layout;
+
+// Infinite animations (e.g., spinners and carousels) never settle, so only finite animations are counted
+var animations = 0;
+if (document.getAnimations) {
+    document.getAnimations().forEach(function (animation) {
+        if (animation.playState === "running" && animation.effect && animation.effect.getComputedTiming().iterations !== Infinity) {
+            animations++;
+        }
+    });
+}
+
+return {
+    readyState: document.readyState,
+    quietFor: (performance.now() - state.lastMutation) / 1000,
+    animations: animations,
+    layoutStable: layoutStable,
+}
@@ -1,31 +1,57 @@
-import json
 import logging
 import multiprocessing as mp
+from multiprocessing.connection import Connection, wait
 import os
-from filelock import FileLock
+import shutil
+import socket
 from signal import signal, SIGTERM
 import sys
 import time
 
 from crawler import Crawler, CrawlDataEncoder, CrawlResults
+from utils.domain_queue import Claim, DomainQueue
+from utils.results_journal import ResultsJournal, load_history
+from utils.timeouts import PhaseBudgets, TimeoutModel
+from utils.metrics import CrawlMetrics
+import utils.slurm as slurm
+import utils.injections as injections
 import config
 
 logger = logging.getLogger(config.LOGGER_NAME)
-SLURM_ARRAY_TASK_ID = int(os.getenv('SLURM_ARRAY_TASK_ID')) # type: ignore
+SLURM_ARRAY_TASK_ID = int(os.getenv('SLURM_ARRAY_TASK_ID', 0))  # 0 when run outside of an array
 
-def worker(domain: str, queue: mp.Queue) -> None:
+def worker(conn: Connection) -> None:
     """
     We need to use multiprocessing to explicitly free up memory after each crawl.
     See https://stackoverflow.com/questions/38164635/selenium-not-freeing-up-memory-even-after-calling-close-quit
     for more details.
+
+    The worker starts its first web driver before it receives the domain to crawl,
+    so a spare worker is ready as soon as the supervisor claims the next domain.
     """
-    logger.info(f"Starting crawl for '{domain}'.")
-    crawler = Crawler(domain, headless=True, wait_time=config.WAIT_TIME)
+    pool = Crawler.get_pool(headless=True)
+    pool.prewarm()
+
+    def before_start(*args):
+        pool.close()
+        sys.exit(0)
+
+    signal(SIGTERM, before_start)
+
+    try:
+        domain, budgets = conn.recv()
+    except EOFError:  # The supervisor exited without needing the spare worker
+        pool.close()
+        return
+    mp.current_process().name = domain
+
+    logger.info(f"Starting crawl for '{domain}' with budgets {budgets}.")
+    crawler = Crawler(domain, headless=True, wait_time=config.WAIT_TIME, phase_budgets=budgets, pool=pool)
     def before_exit(*args):
-        crawler.driver.quit()
+        crawler.close()
 
         crawler.results["SIGTERM"] = True
-        queue.put(crawler.results)
+        conn.send(crawler.results)
 
         sys.exit(0)
 
@@ -34,90 +60,262 @@ def worker(domain: str, queue: mp.Queue) -> None:
     # result = crawler.compliance_algo(config.DEPTH)
     result = crawler.classification_algo(total_actions=config.TOTAL_ACTIONS, clickstream_length=config.CLICKSTREAM_LENGTH)
 
-    queue.put(result)
+    conn.send(result)
+
+class CrawlProcess:
+    """
+    A worker process crawling a single claimed domain.
+
+    The process is started before its domain is claimed (see `start`), so that
+    its web driver can start while the previous crawls are running.
+    """
+
+    def __init__(self) -> None:
+        """
+        Start a worker process that waits for a domain.
+        """
+        self.claim: Claim
+        self.domain: str
+        self.budgets: PhaseBudgets
+        self.start_time: float
+        self.terminate_time: float | None = None  # Set once SIGTERM is sent
+        self.sigkill = False
+        self.lease_lost = False  # Set once the domain may have been claimed by another worker
+        self.result: CrawlResults | None = None
+
+        self.conn, child_conn = mp.Pipe()
+        self.process = mp.Process(target=worker, args=(child_conn,), name="spare")
+        self.process.start()
+        child_conn.close()
+
+    def start(self, claim: Claim, budgets: PhaseBudgets) -> None:
+        """
+        Start crawling the claimed domain.
+
+        Args:
+            claim: Claim of the domain to crawl.
+            budgets: Time budgets for the crawl.
+        """
+        self.claim = claim
+        self.domain = claim.domain
+        self.budgets = budgets
+        self.start_time = time.time()
+
+        self.conn.send((self.domain, budgets))
+
+    def close(self) -> None:
+        """
+        Stop a worker that was never started.
+        """
+        self.conn.close()
+        self.process.join()
+
+    def receive(self) -> None:
+        """
+        Receive the result of the worker if it has been sent.
+        """
+        try:
+            if self.result is None and self.conn.poll():
+                self.result = self.conn.recv()
+        except (EOFError, OSError):
+            pass
+
+    def lose_lease(self) -> None:
+        """
+        Terminate a worker whose lease could not be renewed. Its result is discarded,
+        since the domain may already be crawled by the new owner of the lease.
+        """
+        self.lease_lost = True
+        if self.terminate_time is None:
+            logger.error(f"Lost lease for '{self.domain}', terminating its process.")
+            self.process.terminate()
+            self.terminate_time = time.time()
+
+    def enforce_timeout(self) -> None:
+        """
+        Send SIGTERM once the crawl exceeds its total budget, escalating to SIGKILL
+        if the worker is still alive after `config.TERMINATE_GRACE` seconds.
+        """
+        now = time.time()
+        if self.terminate_time is None:
+            if now - self.start_time > self.budgets["total"]:
+                logger.warning(f"Terminating process for '{self.domain}' due to timeout.")
+                self.process.terminate()
+                self.terminate_time = now
+        elif not self.sigkill and now - self.terminate_time > config.TERMINATE_GRACE:
+            logger.critical(f"SIGTERM failed for '{self.domain}', escalating to SIGKILL.")
+            self.process.kill()
+            self.sigkill = True
+
+def quarantine(claim: Claim) -> None:
+    """
+    Move partial crawl data of a domain whose lease expired out of the crawl directory.
+
+    Data with a checkpoint is left in place, since the next crawl of the domain
+    resumes from the checkpoint (see Crawler.load_checkpoint).
+
+    Args:
+        claim: The expired claim. Attempts include the expired lease.
+    """
+    data_path = f"{config.DATA_PATH}{claim.domain}/"
+    if not os.path.exists(data_path):
+        return
+
+    if os.path.exists(f"{data_path}checkpoint.json"):
+        logger.warning(f"Keeping partial data for '{claim.domain}' to resume from its checkpoint.")
+        return
+
+    quarantine_path = f"{config.QUARANTINE_PATH}{claim.domain}-{claim.attempts}/"
+    os.makedirs(config.QUARANTINE_PATH, exist_ok=True)
+    shutil.move(data_path, quarantine_path)
+    logger.warning(f"Quarantined partial data for '{claim.domain}' in '{quarantine_path}'.")
+
+def get_workers() -> int:
+    """
+    Return the number of concurrent workers that fit in the SLURM allocation.
+
+    A worker runs a web driver per concurrent arm, plus the next driver with DRIVER_LOOKAHEAD.
+    With PREWARM_WORKER, the spare worker also holds a started driver.
+    """
+    drivers = (3 if config.LOCKSTEP_ARMS else 1) + (1 if config.DRIVER_LOOKAHEAD else 0)
+    spare = config.MEMORY_PER_DRIVER if config.PREWARM_WORKER else 0
+
+    return slurm.get_workers(config.CPUS_PER_WORKER, drivers * config.MEMORY_PER_DRIVER, reserved_memory=spare)
+
+def load_timeout_model() -> TimeoutModel:
+    """
+    Fit a timeout model to the results of the crawls in `config.HISTORY_PATHS`.
+    """
+    return TimeoutModel(load_history(config.HISTORY_PATHS), config.TOTAL_ACTIONS, config.TIMEOUT, config.MIN_TIMEOUT, config.MAX_TIMEOUT)
 
 def main():
     logger.setLevel(logging.INFO)
 
-    formatter = logging.Formatter("%(asctime)s %(levelname)s: %(message)s", "%Y-%m-%d %H:%M:%S")
+    formatter = logging.Formatter("%(asctime)s %(levelname)s [%(processName)s]: %(message)s", "%Y-%m-%d %H:%M:%S")
 
     log_file = logging.FileHandler(f'{config.DATA_PATH}/{SLURM_ARRAY_TASK_ID}.log', 'a')
     log_file.setLevel(logging.DEBUG)
     log_file.setFormatter(formatter)
     logger.addHandler(log_file)
 
-    # Create input for pool
-    output = mp.Queue()
-    data = {}
+    injections.load_all(config.MINIFY_INJECTIONS)  # Validated once and shared by the forked workers
+
+    journal = ResultsJournal(f"{config.JOURNAL_PATH}{SLURM_ARRAY_TASK_ID}.jsonl", encoder=CrawlDataEncoder)
+    queue = DomainQueue(config.QUEUE_PATH, journal_mode=config.QUEUE_JOURNAL_MODE)
+    owner = f"{SLURM_ARRAY_TASK_ID}@{socket.gethostname()}:{os.getpid()}"
+    metrics = CrawlMetrics(f"{config.METRICS_PATH}{SLURM_ARRAY_TASK_ID}.prom", SLURM_ARRAY_TASK_ID)
 
-    results_lock = FileLock(config.RESULTS_PATH + '.lock', timeout=10)
-    queue_lock = FileLock(config.QUEUE_PATH + '.lock', timeout=10)
+    workers = config.WORKERS_PER_TASK or get_workers()
+    logger.info(f"Running {workers} concurrent workers.")
 
+    timeouts = load_timeout_model()
+    last_refresh = time.time()
+
+    in_flight: list[CrawlProcess] = []
+    spare: CrawlProcess | None = None  # Worker waiting for the next domain, see config.PREWARM_WORKER
+    last_heartbeat = time.time()
     while True:
-        start_time = time.time()
-        
-        # Get next site to crawl
-        with queue_lock:
-            with open(config.QUEUE_PATH, 'r') as file:
-                sites = json.load(file)
-                if len(sites) == 0:
-                    logger.info("Queue is empty, exiting.")
-                    break
-                domain = sites.pop(0)
-            with open(config.QUEUE_PATH, 'w') as file:
-                json.dump(sites, file)
-                
-        process = mp.Process(target=worker, args=(domain, output))
-        process.start()
-        
-        TIMEOUT = 60 * 60  # 1 hour
-        process.join(TIMEOUT)
-        logger.info(f"Joining process for '{domain}'.")
-        
-        sigkill = False
-        if process.exitcode is None:
-            logger.warn(f"Terminating process for '{domain}' due to timeout.")
-            process.terminate()
-            process.join()
-            
-            time.sleep(60)
-            if process.exitcode is None:
-                logger.critical(f"SIGTERM failed, escalating to SIGKILL.")
-                process.kill()
-                process.join()
-                
-                sigkill = True
-
-
-        result: CrawlResults
-        if not sigkill:
-            try:
-                result = output.get(timeout=60)
-            except mp.queues.Empty:
-                logger.critical(f"Queue for '{domain}' is empty.")
-                result = {
-                    "data_path": f"{config.DATA_PATH}{domain}/",
-                    "SIGKILL": True,
-                }
-        else:
+        metrics.write((crawl.domain, crawl.start_time, crawl.process.pid) for crawl in in_flight)
+
+        # Learn from results collected since the timeout model was fit
+        if time.time() - last_refresh >= config.TIMEOUT_REFRESH:
+            timeouts = load_timeout_model()
+            last_refresh = time.time()
+
+        # Requeue domains of workers that stopped sending heartbeats
+        requeued, abandoned = queue.requeue_expired(config.MAX_ATTEMPTS, config.RETRY_BACKOFF)
+        for expired in requeued:
+            logger.warning(f"Lease expired for '{expired.domain}' (attempt {expired.attempts}/{config.MAX_ATTEMPTS}), requeuing.")
+            quarantine(expired)
+        for expired in abandoned:
+            logger.error(f"Lease expired for '{expired.domain}' (attempt {expired.attempts}/{config.MAX_ATTEMPTS}), abandoning.")
+            quarantine(expired)
             result = {
-                "data_path": f"{config.DATA_PATH}{domain}/",
-                "SIGKILL": True,
+                "data_path": f"{config.DATA_PATH}{expired.domain}/",
+                "lease_expired": True,
+                "attempts": expired.attempts,
             }
-            
-        result['SLURM_ARRAY_TASK_ID'] = SLURM_ARRAY_TASK_ID
-        result['total_time'] = time.time() - start_time
+            journal.append(expired.domain, result)
+            metrics.record(result)
+
+        # Get next sites to crawl
+        while len(in_flight) < workers:
+            claim = queue.claim(owner, config.LEASE_TIME)
+            if claim is None:
+                break
 
-        # Read existing data, update it, and write back
-        with results_lock:
-            with open(config.RESULTS_PATH, 'r') as f:
-                data = json.load(f)
+            if spare is not None and not spare.process.is_alive():
+                logger.error("Spare worker exited unexpectedly.")
+                spare.close()
+                spare = None
+
+            crawl, spare = spare or CrawlProcess(), None
+            crawl.start(claim, timeouts.budgets(claim.domain))
+            in_flight.append(crawl)
+
+        # Start the worker for the next domain while the current domains are crawled
+        if config.PREWARM_WORKER and spare is None and len(queue) > len(in_flight):
+            spare = CrawlProcess()
+
+        if not in_flight:
+            if len(queue) == 0:
+                logger.info("Queue is empty, exiting.")
+                metrics.write([])
+                if spare is not None:
+                    spare.close()
+                break
+
+            # Remaining domains are claimed by other workers or backing off
+            time.sleep(config.HEARTBEAT_INTERVAL)
+            continue
+
+        # Wait until a worker sends its result, exits, or a heartbeat is due
+        wait(
+            [crawl.conn for crawl in in_flight] + [crawl.process.sentinel for crawl in in_flight],
+            timeout=max(0, last_heartbeat + config.HEARTBEAT_INTERVAL - time.time())
+        )
+
+        if time.time() - last_heartbeat >= config.HEARTBEAT_INTERVAL:
+            for crawl in in_flight:
+                if not crawl.lease_lost and not queue.heartbeat(crawl.claim, owner, config.LEASE_TIME):
+                    crawl.lose_lease()
+            last_heartbeat = time.time()
+
+        for crawl in in_flight[:]:
+            crawl.receive()
+            if crawl.process.is_alive():
+                crawl.enforce_timeout()
+                continue
+
+            logger.info(f"Joining process for '{crawl.domain}'.")
+            crawl.process.join()
+            crawl.receive()
+            in_flight.remove(crawl)
+
+            if crawl.lease_lost:
+                logger.warning(f"Discarding result for '{crawl.domain}' after losing its lease.")
+                crawl.conn.close()
+                continue
+
+            result: CrawlResults
+            if crawl.result is not None:
+                result = crawl.result
+            else:
+                if not crawl.sigkill:
+                    logger.critical(f"No result received for '{crawl.domain}'.")
+                result = {
+                    "data_path": f"{config.DATA_PATH}{crawl.domain}/",
+                    "SIGKILL": True,
+                }
 
-        data[domain] = result
+            result['SLURM_ARRAY_TASK_ID'] = SLURM_ARRAY_TASK_ID
+            result['total_time'] = time.time() - crawl.start_time
+            result['attempts'] = crawl.claim.attempts
 
-        with results_lock:
-            with open(config.RESULTS_PATH, 'w') as f:
-                json.dump(data, f, cls=CrawlDataEncoder)
+            journal.append(crawl.domain, result)
+            metrics.record(result)
+            queue.complete(crawl.claim, owner)
+            crawl.conn.close()
 
-if __name__ == "__main__":    
+if __name__ == "__main__":
     main()
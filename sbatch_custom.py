@@ -1,6 +1,8 @@
 import os
 import argparse
+import sys
 import config
+from utils.local_executor import local_run
 
 def sbatch_run(command: str, job_name: str, memory: int, cpus: int):
     """
@@ -44,6 +46,10 @@ def sbatch_run(command: str, job_name: str, memory: int, cpus: int):
 if __name__ == "__main__":    
     parser = argparse.ArgumentParser()
     parser.add_argument("script", help="Script to submit to slurm.")
+    parser.add_argument("--local", action="store_true", help="Run the array on this machine instead of submitting it to SLURM.")
     args = parser.parse_args()
 
-    sbatch_run(f'python3 -u {args.script}', job_name=args.script, memory=4, cpus=2)
+    if args.local:
+        local_run(f'{sys.executable} -u {args.script}', job_name=args.script, jobs="0-24", memory=4, cpus=2, output_path=config.SLURM_LOG_PATH)
+    else:
+        sbatch_run(f'python3 -u {args.script}', job_name=args.script, memory=4, cpus=2)
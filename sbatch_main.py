@@ -3,8 +3,41 @@ import config
 import yaml
 import argparse
 import pathlib
-from filelock import Timeout, FileLock
-import json
+import statistics
+import sys
+from utils.domain_queue import DomainQueue, Priority
+from utils.results_journal import iter_history, load_history
+from utils.resolution_cache import ResolutionCache
+from utils.local_executor import local_run
+import utils.probe as probe
+
+def put_sites(queue: DomainQueue, sites: list[str], history: dict[str, dict]) -> None:
+    """
+    Add sites to the queue, ordered by the results of previous crawls.
+
+    Args:
+        queue: The domain queue.
+        sites: Sites to crawl.
+        history: Map of domain to the results of previous crawls, see load_history.
+    """
+    # Estimate the cost of each site from previous crawls
+    # Sites without history are assumed to take the median time
+    times = [result["total_time"] for result in history.values() if result.get("total_time")]
+    default_cost = statistics.median(times) if times else 0
+    costs = {}
+    for site in sites:
+        result = history.get(site, {})
+        costs[site] = result.get("total_time") or default_cost
+
+    # Sites that were down or failed in a previous crawl are crawled last
+    failed = set()
+    for site in sites:
+        result = history.get(site)
+        if result is not None and (not result.get("url") or result.get("SIGKILL") or result.get("unexpected_exception")):
+            failed.add(site)
+
+    queue.put([site for site in sites if site not in failed], costs=costs)
+    queue.put([site for site in sites if site in failed], priority=Priority.FAILED, costs=costs)
 
 def init():
     """
@@ -16,6 +49,7 @@ def init():
     # Initialize results
     with open(config.RESULTS_PATH, 'w') as f:
         f.write("{}")
+    pathlib.Path(config.JOURNAL_PATH).mkdir()
         
     # Initialize meta.yaml
     config_dict = {
@@ -26,6 +60,7 @@ def init():
         "WAIT_TIME": config.WAIT_TIME,
         "DATA_PATH": config.DATA_PATH,
         "RESULTS_PATH": config.RESULTS_PATH,
+        "JOURNAL_PATH": config.JOURNAL_PATH,
         "QUEUE_PATH": config.QUEUE_PATH,
         "CONFIG_PATH": config.CONFIG_PATH,
     }
@@ -35,16 +70,31 @@ def init():
     # Copy sites.txt to crawl path
     os.system(f'cp {config.SITE_LIST_PATH} {config.DATA_PATH}')
 
-    # Write sites to queue with lock
+    # Write sites to queue
     sites = []
     with open(config.SITE_LIST_PATH) as file:
         for line in file:
             sites.append(line.strip())
-    queue_path = config.QUEUE_PATH
-    queue_lock = FileLock(queue_path + '.lock', timeout=10)
-    with queue_lock:
-        with open(queue_path, 'w') as f:
-            json.dump(sites, f)
+    queue = DomainQueue(config.QUEUE_PATH, journal_mode=config.QUEUE_JOURNAL_MODE)
+
+    history = load_history(config.PREVIOUS_CRAWLS)
+    print(f"Loaded the results of {len(history)} sites from {len(config.PREVIOUS_CRAWLS)} previous crawls.")
+    put_sites(queue, sites, history)
+    queue.close()
+
+    # Seed the resolution cache with the URLs resolved by previous crawls, and the domains they found unreachable
+    # Results read from the cache are skipped, so that they do not extend its time to live
+    if config.RESOLUTION_CACHE_PATH is not None:
+        cache = ResolutionCache(config.RESOLUTION_CACHE_PATH, config.RESOLUTION_TTL, config.NEGATIVE_RESOLUTION_TTL, journal_mode=config.QUEUE_JOURNAL_MODE)
+        cache.seed(
+            (domain, result.get("url"), timestamp)
+            for domain, timestamp, result in iter_history(config.PREVIOUS_CRAWLS)
+            if not result.get("resolution_cached") and (
+                result.get("url")
+                or (probe.unreachable(result.get("probe_outcomes", {}).values()) and not result.get("phase_timeouts"))
+            )
+        )
+        cache.close()
 
 def sbatch_run(command: str, job_name: str, jobs: str, memory: int, cpus: int):
     """
@@ -106,10 +156,17 @@ if __name__ == "__main__":
         '--skip-init',
         action='store_true',
     )
+    parser.add_argument(
+        '--local',
+        action='store_true',
+        help="Run the array on this machine instead of submitting it to SLURM.",
+    )
     args = parser.parse_args()
     
     if not args.skip_init:
         init()
 
-    # subprocess.run(f'python3 main.py --jobs {args.jobs}', shell=True)
-    sbatch_run(f'python3 main.py', job_name='cookie', jobs=args.jobs, memory=4, cpus=2)
\ No newline at end of file
+    if args.local:
+        local_run(f'{sys.executable} main.py', job_name='cookie', jobs=args.jobs, memory=4, cpus=2)
+    else:
+        sbatch_run(f'python3 main.py', job_name='cookie', jobs=args.jobs, memory=4, cpus=2)
\ No newline at end of file
@@ -0,0 +1,46 @@
+from typing import Any
+
+import pytest
+
+import config
+
+
+class StubPool:
+    """
+    Driver pool that hands out a single stub driver instead of starting Firefox.
+    """
+
+    def __init__(self) -> None:
+        self.driver: Any = None  # Returned by acquire, set by each test that needs a driver
+        self.released = 0
+        self.discarded = 0
+
+    def acquire(self) -> Any:
+        return self.driver
+
+    def release(self, driver: Any) -> bool:
+        self.released += 1
+        return True
+
+    def discard(self, driver: Any) -> None:
+        self.discarded += 1
+
+    def close(self) -> None:
+        pass
+
+
+@pytest.fixture
+def pool() -> StubPool:
+    return StubPool()
+
+
+@pytest.fixture
+def crawler(tmp_path, monkeypatch, pool):
+    """
+    Crawler of example.com whose data is stored in a temporary directory.
+    """
+    from crawler import Crawler  # Requires selenium and seleniumwire
+
+    monkeypatch.setattr(config, "DATA_PATH", f"{tmp_path}/")
+
+    return Crawler("example.com", wait_time=0, pool=pool)
@@ -0,0 +1,47 @@
+from utils.capture import NOT_CAPTURED, CapturePolicy, CaptureStorage
+
+
+class FakeStorage:
+    def __init__(self) -> None:
+        self.cleared = False
+
+    def clear_requests(self) -> None:
+        self.cleared = True
+
+
+def har_entry(url: str, mime_type: str, text: str) -> dict:
+    return {
+        "request": {"url": url, "headersSize": 0, "bodySize": 0},
+        "response": {"headersSize": 0, "content": {"mimeType": mime_type, "size": len(text), "text": text}},
+    }
+
+
+def test_policy_keeps():
+    policy = CapturePolicy(mime_types=("text/", "application/json"), max_body_size=10, memory_limit=0)
+
+    assert policy.keeps("text/html; charset=utf-8", 10)
+    assert policy.keeps("Application/JSON", 1)
+    assert not policy.keeps("application/json+ld", 1)
+    assert not policy.keeps("text/html", 11)
+    assert not policy.keeps(None, 1)
+    assert policy.keeps(None, 0)
+
+
+def test_bodies_are_trimmed_and_spilled():
+    storage = CaptureStorage(FakeStorage(), CapturePolicy(mime_types=("text/",), max_body_size=1024, memory_limit=2500))
+
+    storage.save_har_entry("1", har_entry("https://example.com/", "text/html", "<html>"))
+    storage.save_har_entry("2", har_entry("https://example.com/image", "image/png", "PNG"))
+    assert storage.spilled == 0
+    storage.save_har_entry("3", har_entry("https://example.com/style", "text/css", "a {}"))
+    assert storage.spilled == 3  # Above the memory limit
+    storage.save_har_entry("4", har_entry("https://example.com/script", "text/javascript", "0"))
+
+    entries = storage.load_har_entries()
+    assert [entry["request"]["url"].rsplit("/", 1)[1] for entry in entries] == ["", "image", "style", "script"]
+    assert entries[0]["response"]["content"]["text"] == "<html>"
+    assert entries[1]["response"]["content"] == {"mimeType": "image/png", "size": 3, "text": "", "comment": NOT_CAPTURED}
+
+    storage.clear_requests()
+    assert storage.cleared
+    assert storage.load_har_entries() == []
@@ -0,0 +1,38 @@
+import os
+
+import pytest
+
+import config
+from crawler import ClickableElement, Crawler
+
+
+def test_existing_data_without_checkpoint_is_kept(crawler):
+    os.makedirs(f"{crawler.data_path}1/")
+
+    with pytest.raises(FileExistsError):
+        Crawler(crawler.domain, pool=crawler.pool)
+
+    assert os.path.isdir(f"{crawler.data_path}1/")
+
+
+def test_resume_deletes_incomplete_clickstreams(crawler):
+    crawler.url = "https://example.com/"
+    crawler.results["clickstream"] = [[("#a", ClickableElement.BUTTON)]]
+    crawler.save_checkpoint(current_actions=2)
+    os.makedirs(f"{crawler.data_path}1/")
+    os.makedirs(f"{crawler.data_path}2/")  # Interrupted before its checkpoint
+
+    resumed = Crawler(crawler.domain, pool=crawler.pool)
+    assert resumed.load_checkpoint() == 2
+
+    assert resumed.url == "https://example.com/"
+    assert resumed.clickstream == 2
+    assert resumed.results["clickstream"] == [[("#a", ClickableElement.BUTTON)]]
+    assert os.path.isdir(f"{crawler.data_path}1/")
+    assert not os.path.exists(f"{crawler.data_path}2/")
+
+
+def test_new_crawl_deletes_nothing(crawler):
+    assert crawler.load_checkpoint() == 0
+    assert os.listdir(crawler.data_path) == []
+    assert config.DATA_PATH in crawler.data_path
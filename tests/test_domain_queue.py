@@ -0,0 +1,100 @@
+import json
+import os
+import sqlite3
+
+import pytest
+
+from utils.domain_queue import DomainQueue, open_array_queue, read_domains
+
+
+def test_read_domains(tmp_path):
+    path = str(tmp_path / "queue.db")
+    queue = DomainQueue(path)
+    queue.put(["a.com", "b.com", "c.com"], costs={"b.com": 10})
+    queue.claim("owner", lease=60)
+    queue.close()
+
+    assert read_domains(path) == ["a.com", "c.com"]
+
+
+def test_read_domains_is_read_only(tmp_path):
+    path = str(tmp_path / "queue.db")
+    with pytest.raises(sqlite3.OperationalError):
+        read_domains(path)
+
+    assert not os.path.exists(path)
+
+
+def test_read_domains_legacy_json(tmp_path):
+    path = tmp_path / "queue.json"
+    path.write_text(json.dumps(["a.com", "b.com"]))
+
+    assert read_domains(str(path)) == ["a.com", "b.com"]
+
+
+def test_claim_all_claims_expired_leases_of_other_owners(tmp_path):
+    queue = DomainQueue(str(tmp_path / "queue.db"))
+    queue.put(["a.com", "b.com"])
+    queue.claim("dead", lease=0.1)  # Never renewed
+
+    claimed = []
+    for claim in queue.claim_all("owner", lease=60, poll_interval=0.05):
+        claimed.append(claim.domain)
+        queue.complete(claim, "owner")
+
+    assert claimed == ["b.com", "a.com"]
+    assert len(queue) == 0
+
+
+def test_claim_all_completes_own_claims_before_waiting(tmp_path):
+    queue = DomainQueue(str(tmp_path / "queue.db"))
+    queue.put(["a.com", "b.com"])
+    other = queue.claim("other", lease=60)
+
+    held = []
+
+    def on_wait() -> None:
+        for claim in held:
+            queue.complete(claim, "owner")
+        held.clear()
+        queue.complete(other, "other")
+
+    claimed = []
+    for claim in queue.claim_all("owner", lease=60, poll_interval=0.05, on_wait=on_wait):
+        claimed.append(claim.domain)
+        held.append(claim)
+
+    assert claimed == ["b.com"]
+    assert held == []
+    assert len(queue) == 0
+
+
+def test_claim_all_reports_abandoned_domains(tmp_path):
+    queue = DomainQueue(str(tmp_path / "queue.db"))
+    queue.put(["a.com"])
+    queue.claim("dead", lease=0.1)
+
+    abandoned = []
+    claimed = list(queue.claim_all("owner", lease=60, max_attempts=1, poll_interval=0.05, on_abandoned=abandoned.append))
+
+    assert claimed == []
+    assert [claim.domain for claim in abandoned] == ["a.com"]
+
+
+def test_open_array_queue_outside_array_job(monkeypatch):
+    monkeypatch.delenv("SLURM_ARRAY_JOB_ID", raising=False)
+
+    for _ in range(2):  # Every run processes all domains
+        queue, owner = open_array_queue("unused", ["a.com", "b.com"])
+        assert [claim.domain for claim in queue.claim_all(owner, lease=60)] == ["a.com", "b.com"]
+        queue.close()
+
+
+def test_open_array_queue_is_shared_by_tasks(tmp_path, monkeypatch):
+    monkeypatch.setenv("SLURM_ARRAY_JOB_ID", "1")
+
+    first, _ = open_array_queue(str(tmp_path / "queue"), ["a.com", "b.com"], task_id=0)
+    second, _ = open_array_queue(str(tmp_path / "queue"), ["a.com", "b.com"], task_id=1)
+
+    assert len(first) == len(second) == 2
+    assert (tmp_path / "queue-1.db").is_file()
@@ -0,0 +1,49 @@
+import datetime
+import time
+
+import utils.driver_pool as driver_pool
+from utils.driver_pool import DriverPool
+
+
+class FakeDriver:
+    def __init__(self) -> None:
+        self.last_request = None
+        self.quit_called = False
+
+    def quit(self) -> None:
+        self.quit_called = True
+
+
+class FakeRequest:
+    def __init__(self, age: float, answered: bool) -> None:
+        self.date = datetime.datetime.fromtimestamp(time.time() - age)
+        self.response = object() if answered else None
+
+
+def test_release_reports_reset_failure(monkeypatch):
+    pool = DriverPool(FakeDriver)
+    driver = pool.acquire()
+
+    monkeypatch.setattr(driver_pool, "reset_driver", lambda driver: False)
+    assert not pool.release(driver)
+    assert driver.quit_called
+
+
+def test_release_keeps_reset_driver(monkeypatch):
+    pool = DriverPool(FakeDriver)
+    driver = pool.acquire()
+
+    monkeypatch.setattr(driver_pool, "reset_driver", lambda driver: True)
+    assert pool.release(driver)
+    assert pool.acquire() is driver
+
+
+def test_wait_for_network_idle():
+    driver = FakeDriver()
+    assert driver_pool.wait_for_network_idle(driver, quiet_time=0.5, timeout=0)
+
+    driver.last_request = FakeRequest(age=1, answered=True)
+    assert driver_pool.wait_for_network_idle(driver, quiet_time=0.5, timeout=0)
+
+    driver.last_request = FakeRequest(age=1, answered=False)
+    assert not driver_pool.wait_for_network_idle(driver, quiet_time=0.5, timeout=0.2)
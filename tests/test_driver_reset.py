@@ -0,0 +1,73 @@
+import functools
+import http.server
+import shutil
+import threading
+
+import pytest
+
+import config
+
+pytestmark = pytest.mark.skipif(
+    shutil.which("geckodriver") is None or shutil.which("firefox") is None,
+    reason="Requires geckodriver and Firefox",
+)
+
+PAGE = b"""<!DOCTYPE html>
+<html><body><script>localStorage.setItem("visited", "1");</script></body></html>
+"""
+
+
+class PageHandler(http.server.BaseHTTPRequestHandler):
+    """
+    Serves a page at "/" that sets a cookie and local storage, and an empty page at any other path.
+    """
+
+    def do_GET(self) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        if self.path == "/":
+            self.send_header("Set-Cookie", "visited=1; Max-Age=3600; Path=/")
+        self.end_headers()
+        self.wfile.write(PAGE if self.path == "/" else b"<!DOCTYPE html>")
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def url():
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), PageHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield f"http://127.0.0.1:{server.server_port}/"
+
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def pool(tmp_path, monkeypatch):
+    from crawler import Crawler  # Requires selenium and seleniumwire
+    from utils.driver_pool import DriverPool
+
+    monkeypatch.setattr(config, "PROFILE_TEMPLATE_PATH", f"{tmp_path}/profile/")
+
+    pool = DriverPool(functools.partial(Crawler.get_driver, headless=True), size=1)
+    yield pool
+    pool.close()
+
+
+def test_release_clears_site_data(pool, url):
+    driver = pool.acquire()
+    driver.get(url)
+    assert driver.get_cookies()
+    assert driver.execute_script("return localStorage.length;") == 1
+
+    assert pool.release(driver)
+    assert pool.acquire() is driver
+
+    # Same origin, but without setting any data, so only data left from before the release is seen
+    driver.get(url + "empty")
+    assert driver.get_cookies() == []
+    assert driver.execute_script("return localStorage.length;") == 0
@@ -0,0 +1,22 @@
+import json
+
+import utils.har as har
+
+
+def test_write_and_read_har(tmp_path):
+    entries = [{"request": {"url": f"https://example.com/{i}"}} for i in range(3)]
+    path = str(tmp_path / "normal.har.gz")
+
+    assert har.write_har(path, entries) == 3
+    assert har.find_har(str(tmp_path / "normal")) == path
+    assert list(har.iter_har_entries(path)) == entries
+
+
+def test_find_legacy_har(tmp_path):
+    entries = [{"request": {"url": "https://example.com/"}}]
+    path = tmp_path / "normal.json"
+    path.write_text(json.dumps({"log": {"version": "1.2", "entries": entries}}, indent=4))
+
+    assert har.find_har(str(tmp_path / "normal")) == str(path)
+    assert list(har.iter_har_entries(str(path))) == entries
+    assert har.find_har(str(tmp_path / "after_reject")) is None
@@ -0,0 +1,43 @@
+import pytest
+
+import utils.injections as injections
+
+
+@pytest.fixture
+def directory(tmp_path, monkeypatch):
+    monkeypatch.setattr(injections, "DIRECTORY", f"{tmp_path}/")
+
+    return tmp_path
+
+
+def test_minify():
+    source = "/**\n * Doc comment\n */\n\nfunction f() {\n    // Comment\n    return 1; // Kept\n}\n"
+
+    assert injections.minify(source) == "function f() {\nreturn 1; // Kept\n}"
+
+
+def test_requires_are_prepended_once(directory):
+    (directory / "lib.js").write_text("var lib = 1;")
+    (directory / "util.js").write_text("/**\n * @requires lib.js\n */\nvar util = lib;")
+    (directory / "main.js").write_text("/**\n * @requires lib.js\n * @requires util.js\n */\nreturn util;")
+
+    assert injections.load("main.js", minified=True) == "var lib = 1;\nvar util = lib;\nreturn util;"
+
+
+@pytest.mark.parametrize("files", [
+    {"main.js": " * @requires missing.js"},
+    {"main.js": " * @requires other.js", "other.js": " * @requires main.js"},
+])
+def test_invalid_requires(directory, files):
+    for name, source in files.items():
+        (directory / name).write_text(source)
+
+    with pytest.raises(ValueError):
+        injections.load("main.js")
+
+
+def test_all_injections_load():
+    injections.load_all()
+
+    assert "clickable-elements.js" in injections.scripts
+    assert injections.get_script("clickable-elements.js").startswith(injections.load("finder.js"))
@@ -0,0 +1,28 @@
+import pytest
+from seleniumwire.request import Request
+
+from utils.interceptors import block_resource_interceptor
+
+
+def request(url: str, destination: str | None = None) -> Request:
+    headers = [("Sec-Fetch-Dest", destination)] if destination is not None else []
+    return Request(method="GET", url=url, headers=headers)
+
+
+@pytest.mark.parametrize("url, destination, blocked", [
+    ("https://example.com/a", "image", True),
+    ("https://example.com/a", "video", True),
+    ("https://example.com/a.woff2", None, True),
+    ("https://example.com/a.MP4?x=1", "empty", True),
+    ("https://example.com/a.png", "document", False),  # Never blocked by extension
+    ("https://example.com/a.css", None, False),  # Not a blocked type
+    ("https://example.com/", "document", False),
+])
+def test_block_resource_interceptor(url, destination, blocked):
+    req = request(url, destination)
+    block_resource_interceptor(req, blocked=("image", "media", "font"))
+
+    assert (req.response is not None) == blocked
+    if blocked:
+        assert req.response.status_code == 204
+        assert req.response.body == b""
@@ -0,0 +1,38 @@
+import os
+
+from utils.metrics import CrawlMetrics, get_rss
+
+
+def parse(path) -> dict[str, float]:
+    samples = {}
+    for line in path.read_text().splitlines():
+        if not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+
+    return samples
+
+
+def test_metrics_output(tmp_path):
+    path = tmp_path / "metrics" / "3.prom"
+    metrics = CrawlMetrics(str(path), task_id=3)
+    metrics.record({"clickstream": [[("#a", "button")] * 2, [("#b", "link")]], "driver_restarts": 1})
+    metrics.record({"clickstream": [[("#a", "button")] * 4], "resumed_actions": 2, "driver_reset_failures": 1})
+    metrics.record({"landing_page_down": True})
+
+    metrics.write([('quote".com', 0, os.getpid())])
+
+    samples = parse(path)
+    assert samples['cookie_crawl_domains_total{task="3"}'] == 3
+    assert samples['cookie_crawl_actions_total{task="3"}'] == 8  # 3 + 2 + 5 - 2 resumed
+    assert samples['cookie_crawl_failures_total{task="3",category="landing_page_down"}'] == 1
+    assert samples['cookie_crawl_failures_total{task="3",category="SIGKILL"}'] == 0
+    assert samples['cookie_crawl_driver_restarts_total{task="3"}'] == 1
+    assert samples['cookie_crawl_driver_reset_failures_total{task="3"}'] == 1
+    assert samples['cookie_crawl_in_flight{task="3"}'] == 1
+    assert samples['cookie_crawl_in_flight_rss_bytes{task="3",domain="quote\\".com"}'] > 0
+    assert not path.with_suffix(".tmp").exists()
+
+
+def test_rss_of_missing_process():
+    assert get_rss(2 ** 22 + 1) == 0
@@ -0,0 +1,48 @@
+import time
+
+import pytest
+
+from crawler import Crawler, PhaseTimeout
+
+
+class HangingDriver:
+    """
+    Web driver whose page loads never finish.
+    """
+
+    current_url = "about:blank"
+
+    def get(self, url: str) -> None:
+        time.sleep(60)
+
+
+@pytest.fixture
+def crawler(crawler):
+    crawler.phase_budgets = {"resolution": 0.2}
+    crawler.driver = HangingDriver()
+
+    return crawler
+
+
+def test_get_raises_phase_timeout(crawler):
+    start = time.time()
+    with pytest.raises(PhaseTimeout):
+        with crawler.phase("resolution"):
+            crawler.get("https://example.com/")
+
+    assert time.time() - start < 5  # Not retried after the timeout
+    assert crawler.results["phase_timeouts"] == ["resolution"]
+    assert crawler.results["phase_times"]["resolution"] == []
+
+
+def test_crawl_algo_stops_on_phase_timeout(crawler):
+    @Crawler.crawl_algo
+    def algo(self: Crawler) -> None:
+        with self.phase("resolution"):
+            self.get("https://example.com/")
+
+    results = algo(crawler)
+
+    assert results["phase_timeouts"] == ["resolution"]
+    assert not results["landing_page_down"]
+    assert not results["unexpected_exception"]
@@ -0,0 +1,45 @@
+import random
+from collections import Counter
+
+import pytest
+
+import config
+from crawler import ClickableElement, ClickCandidate, Crawler
+
+
+def candidate(selector: str, in_viewport: bool = True, occluded: bool | None = False, disabled: bool = False) -> ClickCandidate:
+    return ClickCandidate(selector, ClickableElement.BUTTON, in_viewport, occluded, disabled, area=100)
+
+
+def pop_all(candidates: list[ClickCandidate]) -> list[str]:
+    return [Crawler.pop_candidate(candidates).selector for _ in range(len(candidates))]
+
+
+@pytest.mark.parametrize("weighting", ["interactable", "weighted"])
+def test_unlikely_clickable_elements_are_chosen_last(weighting, monkeypatch):
+    monkeypatch.setattr(config, "CLICK_WEIGHTING", weighting)
+    random.seed(0)
+
+    for _ in range(20):
+        order = pop_all([candidate("#disabled", disabled=True), candidate("#a"), candidate("#occluded", occluded=True), candidate("#b")])
+        assert set(order[:2]) == {"#a", "#b"}
+
+
+def test_uniform_ignores_metadata(monkeypatch):
+    monkeypatch.setattr(config, "CLICK_WEIGHTING", "uniform")
+    random.seed(0)
+
+    first = Counter(pop_all([candidate("#disabled", disabled=True), candidate("#a")])[0] for _ in range(200))
+    assert first["#disabled"] > 50
+
+
+def test_viewport_weight(monkeypatch):
+    monkeypatch.setattr(config, "CLICK_WEIGHTING", "weighted")
+    monkeypatch.setattr(config, "VIEWPORT_WEIGHT", 9)
+    random.seed(0)
+
+    first = Counter(
+        Crawler.pop_candidate([candidate("#outside", in_viewport=False, occluded=None), candidate("#inside")]).selector
+        for _ in range(1000)
+    )
+    assert 850 < first["#inside"] < 950  # 90% expected
@@ -0,0 +1,70 @@
+import http.server
+import socket
+import threading
+
+import utils.probe as probe
+
+
+def serve(handler: type[http.server.BaseHTTPRequestHandler]) -> http.server.HTTPServer:
+    """
+    Start a server on localhost that handles a single request.
+    """
+    server = http.server.HTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.handle_request, daemon=True).start()
+
+    return server
+
+
+class RedirectHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        self.send_response(301)
+        self.send_header("Location", "http://127.0.0.1:9/")  # Refuses connections
+        self.end_headers()
+
+
+class DisconnectHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        self.close_connection = True  # Closed without a response, raising RemoteDisconnected
+
+
+def test_error_status_answers():
+    server = serve(http.server.BaseHTTPRequestHandler)  # Answers 501 Not Implemented
+    try:
+        assert probe.probe_url(f"http://127.0.0.1:{server.server_port}/", timeout=5) == probe.Outcome.ANSWERED
+    finally:
+        server.server_close()
+
+    assert probe.probe_url(f"http://127.0.0.1:{server.server_port}/", timeout=5) == probe.Outcome.REFUSED
+
+
+def test_redirect_answers():
+    server = serve(RedirectHandler)
+    try:
+        assert probe.probe_url(f"http://127.0.0.1:{server.server_port}/", timeout=5) == probe.Outcome.ANSWERED
+    finally:
+        server.server_close()
+
+
+def test_dropped_connection_answers():
+    server = serve(DisconnectHandler)
+    try:
+        assert probe.probe_url(f"http://127.0.0.1:{server.server_port}/", timeout=5) == probe.Outcome.ANSWERED
+    finally:
+        server.server_close()
+
+
+def test_unresolved_host():
+    try:
+        socket.getaddrinfo("cookie-classify.invalid", 80)
+    except socket.gaierror as e:
+        if e.errno not in probe.NONEXISTENT_HOST_ERRORS:
+            return  # No DNS resolver in this environment
+
+    assert probe.probe_url("http://cookie-classify.invalid/", timeout=5) == probe.Outcome.UNRESOLVED
+
+
+def test_unreachable():
+    assert probe.unreachable([probe.Outcome.REFUSED.value, probe.Outcome.UNRESOLVED.value])
+    assert not probe.unreachable([probe.Outcome.REFUSED, probe.Outcome.FAILED])
+    assert not probe.unreachable([probe.Outcome.REFUSED, probe.Outcome.ANSWERED])
+    assert not probe.unreachable([])
@@ -0,0 +1,22 @@
+from sbatch_main import put_sites
+from utils.domain_queue import DomainQueue
+from utils.results_journal import ResultsJournal, load_history
+
+
+def test_queue_order_is_learned_from_previous_crawls(tmp_path):
+    previous = f"{tmp_path}/previous/"
+    journal = ResultsJournal(f"{previous}results/0.jsonl")
+    journal.append("fast.com", {"url": "https://fast.com/", "total_time": 10})
+    journal.append("slow.com", {"url": "https://slow.com/", "total_time": 100})
+    journal.append("down.com", {"url": None})
+    journal.append("killed.com", {"url": "https://killed.com/", "SIGKILL": True})
+
+    queue = DomainQueue(":memory:")
+    put_sites(queue, ["down.com", "fast.com", "new.com", "killed.com", "slow.com"], load_history([previous]))
+
+    order = []
+    while (claim := queue.claim("owner", lease=60)) is not None:
+        order.append(claim.domain)
+
+    # Longest first, new sites with the median time, and failed sites last
+    assert order == ["slow.com", "new.com", "fast.com", "down.com", "killed.com"]
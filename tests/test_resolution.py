@@ -0,0 +1,85 @@
+from types import SimpleNamespace
+
+import pytest
+
+import config
+import utils.probe as probe
+from crawler import Crawler, DomainUnreachable, LandingPageDown, UrlDown
+from utils.resolution_cache import ResolutionCache
+
+
+@pytest.fixture
+def crawler(crawler, tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "RESOLUTION_CACHE_PATH", str(tmp_path / "resolutions.db"))
+    monkeypatch.setattr(config, "PROBE", True)
+
+    return crawler
+
+
+def probed(outcome: probe.Outcome):
+    return lambda domain, timeout: {url: outcome for url in probe.get_candidate_urls(domain)}
+
+
+def cached(crawler: Crawler):
+    cache = ResolutionCache(config.RESOLUTION_CACHE_PATH, config.RESOLUTION_TTL, config.NEGATIVE_RESOLUTION_TTL)
+    try:
+        return cache.get(crawler.domain)
+    finally:
+        cache.close()
+
+
+def test_unreachable_domain_is_cached(crawler, monkeypatch):
+    monkeypatch.setattr(probe, "probe_domain", probed(probe.Outcome.REFUSED))
+
+    with pytest.raises(DomainUnreachable):
+        crawler.resolve_url()
+
+    assert cached(crawler).url is None
+
+
+def test_transient_failure_is_not_cached(crawler, monkeypatch):
+    monkeypatch.setattr(probe, "probe_domain", probed(probe.Outcome.FAILED))
+
+    with pytest.raises(LandingPageDown):
+        crawler.resolve_url()
+
+    assert cached(crawler) is None
+
+
+def test_unreachable_domain_is_not_cached_after_phase_timeout(crawler, monkeypatch):
+    monkeypatch.setattr(probe, "probe_domain", probed(probe.Outcome.UNRESOLVED))
+    crawler.results["phase_timeouts"].append("resolution")
+
+    with pytest.raises(DomainUnreachable):
+        crawler.resolve_url()
+
+    assert cached(crawler) is None
+
+
+
+class StubDriver:
+    def __init__(self) -> None:
+        self.backend = SimpleNamespace(options={})
+        self.request_interceptor = None
+
+
+def test_cached_url_that_is_down_is_resolved_again(crawler, pool, monkeypatch):
+    cache = ResolutionCache(config.RESOLUTION_CACHE_PATH, config.RESOLUTION_TTL, config.NEGATIVE_RESOLUTION_TTL)
+    cache.put(crawler.domain, "https://old.example.com/")
+    cache.close()
+
+    def get(url: str) -> str:
+        if url == "https://old.example.com/":
+            raise UrlDown()
+        return url
+
+    pool.driver = StubDriver()
+    monkeypatch.setattr(crawler, "get", get)
+    monkeypatch.setattr(probe, "probe_domain", probed(probe.Outcome.ANSWERED))
+
+    url = crawler.resolve_url()
+
+    assert url == probe.get_candidate_urls(crawler.domain)[0]
+    assert cached(crawler).url == url
+    assert "resolution_cached" not in crawler.results
+    assert pool.released == 2
@@ -0,0 +1,34 @@
+import json
+
+from utils.results_journal import ResultsJournal, compact_results, load_results
+
+
+def test_truncated_tail_is_repaired(tmp_path):
+    path = tmp_path / "results" / "0.jsonl"
+    journal = ResultsJournal(path)
+    journal.append("a.com", {"attempts": 1})
+    with open(path, "a") as file:
+        file.write('{"domain": "b.com", "timestamp"')  # Killed mid-write
+
+    journal = ResultsJournal(path)
+    journal.append("c.com", {"attempts": 1})
+
+    results = load_results(tmp_path / "results.json", tmp_path / "results")
+    assert set(results) == {"a.com", "c.com"}
+
+
+def test_latest_entry_wins(tmp_path):
+    journal_path = tmp_path / "results"
+    (tmp_path / "results.json").write_text(json.dumps({"a.com": {"attempts": 0}, "b.com": {"attempts": 0}}))
+
+    # The later entry is in the journal that is read first
+    late = ResultsJournal(journal_path / "0.jsonl")
+    early = ResultsJournal(journal_path / "1.jsonl")
+    early.append("a.com", {"attempts": 1})
+    late.append("a.com", {"attempts": 2})
+
+    results = load_results(tmp_path / "results.json", journal_path)
+    assert results == {"a.com": {"attempts": 2}, "b.com": {"attempts": 0}}
+
+    assert compact_results(tmp_path / "results.json", journal_path) == 2
+    assert load_results(tmp_path / "results.json") == results
@@ -0,0 +1,50 @@
+import json
+
+import pytest
+from selenium.common.exceptions import JavascriptException
+
+import crawler as crawler_module
+
+
+def fake_injection(results: list[dict]):
+    """
+    Return an inject_script that returns the given snapshots in order and records the injected parts.
+    """
+    calls: list[str] = []
+
+    def inject_script(name: str) -> dict:
+        calls.append(name)
+        return results.pop(0)
+
+    return inject_script, calls
+
+
+def test_failed_part_is_taken_again(crawler):
+    crawler.inject_script, calls = fake_injection([
+        {"innerText": None, "links": ["a"], "errors": {"innerText": "TypeError: document.body is null"}},
+        {"innerText": "Hello"},
+    ])
+
+    assert crawler.snapshot(("innerText", "links")) == {"innerText": "Hello", "links": ["a"]}
+    assert calls == [crawler_module.register_snapshot(("innerText", "links")), crawler_module.register_snapshot(("innerText",))]
+
+
+def test_failed_features_are_not_recorded(crawler, tmp_path):
+    failed = {"innerText": None, "links": [], "img": [], "errors": {"innerText": "TypeError"}}
+    crawler.inject_script, _ = fake_injection([dict(failed), dict(failed), dict(failed)])
+
+    with pytest.raises(JavascriptException):
+        crawler.extract_features(tmp_path, "baseline")
+
+    assert not (tmp_path / "features.json").exists()
+
+
+def test_features_are_recorded(crawler, tmp_path):
+    crawler.inject_script, _ = fake_injection([{"innerText": "a b a", "links": ["x"], "img": []}])
+
+    crawler.extract_features(tmp_path, "baseline")
+
+    features = json.loads((tmp_path / "features.json").read_text())
+    assert features["innerText"]["baseline"] == [{"a": 2, "b": 1}]
+    assert features["links"]["baseline"] == [{"x": 1}]
+    assert features["img"]["baseline"] == [{}]
@@ -0,0 +1,43 @@
+from utils.timeouts import TimeoutModel
+
+
+def history(count: int, arm: float, total_time: float) -> dict[str, dict]:
+    return {
+        f"{i}.com": {
+            "url": f"https://{i}.com/",
+            "total_time": total_time,
+            "clickstream": [[("#a", "button")] * 4],  # 5 actions
+            "phase_times": {"arm": [arm]},
+        }
+        for i in range(count)
+    }
+
+
+def test_default_without_enough_samples():
+    model = TimeoutModel(history(19, arm=10, total_time=100), total_actions=50, default_timeout=3600, min_timeout=1, max_timeout=7200)
+
+    assert model.phases == {}
+    assert model.budgets("new.com") == {"total": 3600}
+
+
+def test_budgets_are_fit_and_clamped():
+    results = history(20, arm=10, total_time=100)
+    results["slow.com"] = {"url": "https://slow.com/", "total_time": 5000}
+    results["killed.com"] = {"url": "https://killed.com/", "total_time": 10 ** 6, "SIGKILL": True}
+
+    model = TimeoutModel(results, total_actions=50, default_timeout=3600, min_timeout=20, max_timeout=1200)
+
+    assert model.phases == {"arm": 20}  # 10 * 1.5, raised to the minimum
+    assert model.total == 1200  # 20 seconds per action * 50 actions * 1.5, lowered to the maximum
+    assert model.budgets("new.com")["total"] == 1200
+    assert model.budgets("slow.com")["total"] == 1200  # Not beyond the maximum on a retry
+
+
+def test_retry_gets_more_time():
+    results = history(20, arm=10, total_time=10)
+    results["slow.com"] = {"url": "https://slow.com/", "total_time": 400}
+
+    model = TimeoutModel(results, total_actions=5, default_timeout=3600, min_timeout=1, max_timeout=7200)
+
+    assert model.total == 15
+    assert model.budgets("slow.com")["total"] == 600
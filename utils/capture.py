@@ -0,0 +1,195 @@
+from collections.abc import Iterator
+from typing import Any, NamedTuple
+import json
+import tempfile
+import threading
+
+from seleniumwire.request import Request, Response
+
+"""
+Memory-bounded capture of requests and HAR entries for seleniumwire.
+
+By default, seleniumwire keeps every request and response body until `del driver.requests`.
+CaptureStorage wraps the request storage of a web driver, drops bodies that the capture
+policy does not keep, and spills HAR entries to a temporary file once they exceed a memory
+ceiling. Headers, cookies, and timings are always kept.
+"""
+
+NOT_CAPTURED = "Body not captured, see utils/capture.py"  # HAR comment of a dropped body
+
+
+class CapturePolicy(NamedTuple):
+    """
+    Which bodies are kept in the request storage and HAR log.
+    """
+
+    mime_types: tuple[str, ...]  # MIME types (or prefixes ending in '/', e.g., "text/") of kept bodies
+    max_body_size: int  # Maximum size (bytes) of a kept body
+    memory_limit: int  # Bytes of HAR entries held in memory before they are spilled to disk
+
+    def keeps(self, content_type: str | None, size: int) -> bool:
+        """
+        Return whether a body is kept.
+
+        Args:
+            content_type: Value of the Content-Type header, if any.
+            size: Size of the body in bytes.
+        """
+        if size == 0:
+            return True
+        if size > self.max_body_size or not content_type:
+            return False
+
+        mime_type = content_type.split(";")[0].strip().lower()
+        return any(
+            mime_type.startswith(kept) if kept.endswith("/") else mime_type == kept
+            for kept in self.mime_types
+        )
+
+
+def entry_size(entry: dict) -> int:
+    """
+    Estimate the memory used by a HAR entry without serializing it.
+    """
+    size = 1024  # Timings, cookies, and other small fields
+    size += entry["request"].get("headersSize", 0) + len(entry["request"]["url"])
+    size += entry["response"].get("headersSize", 0)
+    size += len(entry["response"]["content"].get("text") or "")
+    size += len(entry["request"].get("postData", {}).get("text") or "")
+
+    return size
+
+
+class CaptureStorage:
+    """
+    Request storage of a web driver that applies a CapturePolicy.
+
+    Wraps the storage created by seleniumwire (see `install`). Requests and responses are stored
+    by the wrapped storage after their bodies are trimmed. HAR entries are kept by CaptureStorage,
+    in the order their responses completed, so they survive requests evicted by the wrapped storage.
+    """
+
+    def __init__(self, storage: Any, policy: CapturePolicy) -> None:
+        """
+        Args:
+            storage: The request storage of seleniumwire (e.g., `driver.backend.storage`).
+            policy: Which bodies to keep.
+        """
+        self.storage = storage
+        self.policy = policy
+
+        self.lock = threading.Lock()  # Requests are captured on the threads of the proxy
+        self.har_entries: list[dict] = []  # HAR entries held in memory
+        self.har_size = 0  # Estimated bytes of self.har_entries
+        self.spill: Any = None  # Temporary JSON Lines file of spilled HAR entries
+        self.spilled = 0  # Number of HAR entries in self.spill
+
+    @staticmethod
+    def install(driver: Any, policy: CapturePolicy) -> "CaptureStorage":
+        """
+        Replace the request storage of a web driver with a CaptureStorage.
+
+        Args:
+            driver: A seleniumwire web driver.
+            policy: Which bodies to keep.
+
+        Returns:
+            The installed storage.
+        """
+        storage = CaptureStorage(driver.backend.storage, policy)
+        driver.backend.storage = storage
+
+        return storage
+
+    def __getattr__(self, name: str) -> Any:
+        # Everything not overridden (e.g., home_dir, find, load_requests) is delegated
+        return getattr(self.storage, name)
+
+    def save_request(self, request: Request) -> None:
+        if not self.policy.keeps(request.headers.get("Content-Type"), len(request.body)):
+            request.body = b""
+        self.storage.save_request(request)
+
+    def save_response(self, request_id: str, response: Response) -> None:
+        if not self.policy.keeps(response.headers.get("Content-Type"), len(response.body)):
+            response.body = b""
+        self.storage.save_response(request_id, response)
+
+    def save_har_entry(self, request_id: str, entry: dict) -> None:
+        """
+        Trim the bodies of a HAR entry and keep it, spilling all entries to disk above the memory ceiling.
+
+        Args:
+            request_id: The id of the request, unused since entries are kept in order of completion.
+            entry: The HAR entry created by seleniumwire.
+        """
+        content = entry["response"]["content"]
+        if not self.policy.keeps(content.get("mimeType"), content.get("size", 0)):
+            content["text"] = ""
+            content.pop("encoding", None)
+            content["comment"] = NOT_CAPTURED
+
+        post_data = entry["request"].get("postData")
+        if post_data is not None and not self.policy.keeps(post_data.get("mimeType"), entry["request"].get("bodySize", 0)):
+            post_data["text"] = ""
+            post_data["params"] = []
+            post_data["comment"] = NOT_CAPTURED
+
+        with self.lock:
+            self.har_entries.append(entry)
+            self.har_size += entry_size(entry)
+            if self.har_size > self.policy.memory_limit:
+                self.flush()
+
+    def flush(self) -> None:
+        """
+        Spill the HAR entries held in memory to a temporary file. The caller must hold self.lock.
+        """
+        if self.spill is None:
+            self.spill = tempfile.NamedTemporaryFile("w", encoding="utf-8", prefix="har-", suffix=".jsonl")
+
+        for entry in self.har_entries:
+            self.spill.write(json.dumps(entry) + "\n")
+        self.spill.flush()
+
+        self.spilled += len(self.har_entries)
+        self.har_entries = []
+        self.har_size = 0
+
+    def iter_har_entries(self) -> Iterator[dict]:
+        """
+        Return an iterator over all HAR entries, including spilled entries.
+
+        Entries captured after the call are not included.
+        """
+        with self.lock:
+            spilled = self.spilled
+            spill_path = self.spill.name if self.spill is not None else None
+            entries = list(self.har_entries)
+
+        if spill_path is not None and spilled:
+            with open(spill_path, encoding="utf-8") as file:
+                for _, line in zip(range(spilled), file):
+                    yield json.loads(line)
+
+        yield from entries
+
+    def load_har_entries(self) -> list[dict]:
+        return list(self.iter_har_entries())
+
+    def clear_har_entries(self) -> None:
+        with self.lock:
+            self.har_entries = []
+            self.har_size = 0
+            self.spilled = 0
+            if self.spill is not None:
+                self.spill.close()
+                self.spill = None
+
+    def clear_requests(self) -> None:
+        self.storage.clear_requests()
+        self.clear_har_entries()
+
+    def cleanup(self) -> None:
+        self.clear_har_entries()
+        self.storage.cleanup()
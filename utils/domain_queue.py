@@ -0,0 +1,371 @@
+from collections.abc import Callable, Mapping
+from contextlib import contextmanager
+from enum import IntEnum
+from pathlib import Path
+from typing import Iterable, Iterator, NamedTuple, Optional
+import json
+import os
+import socket
+import sqlite3
+import time
+
+
+class Priority(IntEnum):
+    """
+    Priority of a queued domain. Higher priorities are claimed first.
+    """
+
+    URGENT = 1  # e.g., domains injected with `inject.py --urgent`
+    NORMAL = 0
+    FAILED = -1  # Domains that were down or failed in a previous attempt
+
+
+class Claim(NamedTuple):
+    """
+    A domain leased to a single worker.
+    """
+
+    id: int  # Row ID of the claimed domain
+    domain: str
+    attempts: int  # Number of previous claims whose lease expired
+
+
+UNCLAIMED_DOMAINS = "SELECT domain FROM queue WHERE owner IS NULL ORDER BY priority DESC, cost DESC, id"
+
+
+class DomainQueue:
+    """
+    Transactional queue of domains backed by SQLite.
+
+    Each claim is a single `BEGIN IMMEDIATE` transaction that looks up the head
+    of the queue through an index, so claiming is O(log n) regardless of the size
+    of the site list.
+
+    Domains are ordered by priority, then by estimated cost (longest first), then
+    by insertion order. Scheduling the longest crawls first keeps cheap crawls for
+    the end of the queue, where they fill the gaps while the last long crawls finish.
+
+    A claimed domain stays in the queue with a lease that its owner must renew with
+    `heartbeat`. If the owner dies, the lease expires and `requeue_expired` returns
+    the domain to the queue after an exponential back-off.
+
+    NOTE: The default rollback journal is safe for workers on different hosts sharing
+    the queue over NFS. WAL mode is faster, but relies on shared memory between
+    connections, so only use `journal_mode="WAL"` if the queue is on node-local storage.
+    """
+
+    def __init__(self, path: str, timeout: float = 60, journal_mode: str = "DELETE") -> None:
+        """
+        Args:
+            path: Path to the SQLite database. Created if it does not exist.
+            timeout: Seconds to wait for a competing transaction to finish. Defaults to 60.
+            journal_mode: SQLite journal mode. Defaults to "DELETE".
+        """
+        self.path = path
+
+        # Transactions are managed explicitly in `transaction`
+        self.connection = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+        self.connection.execute(f"PRAGMA journal_mode={journal_mode}")
+        # NORMAL is only durable with WAL, a rollback journal must be synced on every commit
+        self.connection.execute(f"PRAGMA synchronous={'NORMAL' if journal_mode.upper() == 'WAL' else 'FULL'}")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS queue ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "domain TEXT NOT NULL, "
+            "owner TEXT, "  # NULL iff the domain is not claimed
+            "lease_expires REAL, "
+            "attempts INTEGER NOT NULL DEFAULT 0, "
+            "not_before REAL NOT NULL DEFAULT 0, "  # Earliest time the domain may be claimed
+            "priority INTEGER NOT NULL DEFAULT 0, "
+            "cost REAL NOT NULL DEFAULT 0"  # Estimated time to crawl the domain
+            ")"
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS pending ON queue (priority DESC, cost DESC, id) WHERE owner IS NULL")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS leased ON queue (lease_expires) WHERE owner IS NOT NULL")
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Run a block inside a write transaction, rolling back on any exception.
+        """
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield self.connection
+        except BaseException:
+            self.connection.execute("ROLLBACK")
+            raise
+        self.connection.execute("COMMIT")
+
+    def put(self, domains: Iterable[str], priority: Priority = Priority.NORMAL, costs: Optional[Mapping[str, float]] = None) -> None:
+        """
+        Add domains to the queue.
+
+        Args:
+            domains: Domains to add. Domains with equal priority and cost are claimed in this order.
+            priority: Priority of the domains. Defaults to Priority.NORMAL.
+            costs: Estimated time to crawl each domain. Defaults to None, where all costs are 0.
+        """
+        costs = costs or {}
+        with self.transaction() as connection:
+            connection.executemany(
+                "INSERT INTO queue (domain, priority, cost) VALUES (?, ?, ?)",
+                ((domain, int(priority), costs.get(domain, 0)) for domain in domains)
+            )
+
+    def put_once(self, domains: Iterable[str], costs: Optional[Mapping[str, float]] = None) -> bool:
+        """
+        Add domains to the queue unless they were already added by a previous call.
+
+        Lets every task of an array job open the same queue without a separate initialization step.
+
+        Args:
+            domains: Domains to add.
+            costs: Estimated time to process each domain. Defaults to None, where all costs are 0.
+
+        Returns:
+            True iff the domains were added by this call.
+        """
+        costs = costs or {}
+        with self.transaction() as connection:
+            if connection.execute("PRAGMA user_version").fetchone()[0] != 0:
+                return False
+
+            connection.executemany(
+                "INSERT INTO queue (domain, cost) VALUES (?, ?)",
+                ((domain, costs.get(domain, 0)) for domain in domains)
+            )
+            connection.execute("PRAGMA user_version = 1")
+
+        return True
+
+    def claim(self, owner: str, lease: float) -> Claim | None:
+        """
+        Lease the domain at the front of the queue.
+
+        Domains that are backing off after an expired lease are skipped until their back-off ends.
+        See the class docstring for the order in which domains are claimed.
+
+        Args:
+            owner: Unique name of the claiming worker.
+            lease: Seconds until the lease expires unless renewed with `heartbeat`.
+
+        Returns:
+            The claim, or None if no domain can currently be claimed.
+        """
+        now = time.time()
+        with self.transaction() as connection:
+            row = connection.execute(
+                "SELECT id, domain, attempts FROM queue WHERE owner IS NULL AND not_before <= ? "
+                "ORDER BY priority DESC, cost DESC, id LIMIT 1",
+                (now,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            connection.execute(
+                "UPDATE queue SET owner = ?, lease_expires = ? WHERE id = ?",
+                (owner, now + lease, row[0])
+            )
+
+        return Claim(*row)
+
+    def heartbeat(self, claim: Claim, owner: str, lease: float) -> bool:
+        """
+        Renew the lease of a claim.
+
+        Args:
+            claim: Claim to renew.
+            owner: Name of the worker that owns the claim.
+            lease: Seconds from now until the lease expires.
+
+        Returns:
+            False if the lease was already lost (e.g., it expired and was requeued).
+        """
+        with self.transaction() as connection:
+            cursor = connection.execute(
+                "UPDATE queue SET lease_expires = ? WHERE id = ? AND owner = ?",
+                (time.time() + lease, claim.id, owner)
+            )
+
+        return cursor.rowcount == 1
+
+    def complete(self, claim: Claim, owner: str) -> None:
+        """
+        Remove a claimed domain from the queue once its results are saved.
+
+        Args:
+            claim: Claim to complete.
+            owner: Name of the worker that owns the claim.
+        """
+        with self.transaction() as connection:
+            connection.execute("DELETE FROM queue WHERE id = ? AND owner = ?", (claim.id, owner))
+
+    def requeue_expired(self, max_attempts: int, backoff: float) -> tuple[list[Claim], list[Claim]]:
+        """
+        Release all claims whose lease has expired.
+
+        A released domain may be claimed again after `backoff * 2 ** (attempts - 1)` seconds
+        and is demoted to Priority.FAILED. Domains that have reached `max_attempts` are removed
+        from the queue instead.
+
+        Args:
+            max_attempts: Maximum number of expired leases before a domain is abandoned.
+            backoff: Base back-off in seconds.
+
+        Returns:
+            Tuple of (requeued, abandoned) claims. Attempts include the expired lease.
+        """
+        now = time.time()
+        requeued: list[Claim] = []
+        abandoned: list[Claim] = []
+        with self.transaction() as connection:
+            rows = connection.execute(
+                "SELECT id, domain, attempts FROM queue WHERE owner IS NOT NULL AND lease_expires < ?",
+                (now,)
+            ).fetchall()
+
+            for id, domain, attempts in rows:
+                claim = Claim(id, domain, attempts + 1)
+
+                if claim.attempts >= max_attempts:
+                    connection.execute("DELETE FROM queue WHERE id = ?", (id,))
+                    abandoned.append(claim)
+                else:
+                    connection.execute(
+                        "UPDATE queue SET owner = NULL, lease_expires = NULL, attempts = ?, not_before = ?, "
+                        "priority = MIN(priority, ?) WHERE id = ?",
+                        (claim.attempts, now + backoff * 2 ** (claim.attempts - 1), int(Priority.FAILED), id)
+                    )
+                    requeued.append(claim)
+
+        return requeued, abandoned
+
+    def heartbeat_all(self, owner: str, lease: float) -> int:
+        """
+        Renew the leases of all claims of a worker.
+
+        Args:
+            owner: Name of the worker.
+            lease: Seconds from now until the leases expire.
+
+        Returns:
+            Number of renewed leases.
+        """
+        with self.transaction() as connection:
+            cursor = connection.execute(
+                "UPDATE queue SET lease_expires = ? WHERE owner = ?",
+                (time.time() + lease, owner)
+            )
+
+        return cursor.rowcount
+
+    def claim_all(self, owner: str, lease: float, max_attempts: int = 3, poll_interval: float = 60, on_wait: Optional[Callable[[], None]] = None, on_abandoned: Optional[Callable[[Claim], None]] = None) -> Iterator[Claim]:
+        """
+        Claim domains one at a time until no domains are left except the claims of the owner.
+
+        Before each claim, the leases of all claims of the owner are renewed, so a lease only
+        needs to outlast the work on one domain, and expired leases are requeued without
+        back-off. While other workers hold the remaining domains, the queue is polled, so the
+        domains of a worker that died are claimed once their leases expire. The caller is
+        responsible for completing each claim, and must complete its claims in `on_wait`,
+        since two workers waiting while holding claims would wait for each other forever.
+
+        Args:
+            owner: Unique name of the claiming worker.
+            lease: Seconds until each lease expires unless renewed.
+            max_attempts: Maximum number of expired leases before a domain is abandoned. Defaults to 3.
+            poll_interval: Seconds between claims while other workers hold the remaining domains. Defaults to 60.
+            on_wait: Called before waiting for other workers (e.g., to save results and complete claims). Defaults to None.
+            on_abandoned: Called with each claim abandoned after `max_attempts` expired leases. Defaults to None.
+        """
+        while True:
+            self.heartbeat_all(owner, lease)
+
+            _, abandoned = self.requeue_expired(max_attempts, backoff=0)
+            if on_abandoned is not None:
+                for expired in abandoned:
+                    on_abandoned(expired)
+
+            claim = self.claim(owner, lease)
+            if claim is not None:
+                yield claim
+                continue
+
+            remaining = self.connection.execute(
+                "SELECT COUNT(*) FROM queue WHERE owner IS NULL OR owner != ?", (owner,)
+            ).fetchone()[0]
+            if remaining == 0:
+                return
+
+            if on_wait is not None:
+                on_wait()
+            time.sleep(poll_interval)
+
+    def domains(self) -> list[str]:
+        """
+        Return all unclaimed domains in claim order without removing them.
+        """
+        return [row[0] for row in self.connection.execute(UNCLAIMED_DOMAINS)]
+
+    def __len__(self) -> int:
+        """
+        Return the number of domains in the queue, including claimed domains.
+        """
+        return self.connection.execute("SELECT COUNT(*) FROM queue").fetchone()[0]
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+def read_domains(path: str) -> list[str]:
+    """
+    Return the unclaimed domains of a crawl queue in claim order, without writing to it.
+
+    Unlike `DomainQueue(path).domains()`, the database is opened read-only, so reading the
+    queue of a running crawl never creates, migrates, or locks it for writing.
+
+    Args:
+        path: QUEUE_PATH of a crawl. Crawls before the SQLite queue stored it as a JSON list
+            of domains ('queue.json'), which is read as is.
+    """
+    if path.endswith(".json"):
+        with open(path, "r") as file:
+            return json.load(file)
+
+    connection = sqlite3.connect(f"{Path(path).resolve().as_uri()}?mode=ro", uri=True)
+    try:
+        return [row[0] for row in connection.execute(UNCLAIMED_DOMAINS)]
+    finally:
+        connection.close()
+
+
+def open_array_queue(path: str, domains: Iterable[str], costs: Optional[Mapping[str, float]] = None, task_id: int = 0) -> tuple[DomainQueue, str]:
+    """
+    Open the work queue shared by all tasks of a SLURM array job (e.g., of an analysis script).
+
+    Each job gets a fresh queue at `<path>-<SLURM_ARRAY_JOB_ID>.db`, which the first task to
+    open it fills with the domains (see `put_once`). Outside of an array job (e.g., a script
+    run directly), the queue is kept in memory, so every run processes all domains.
+
+    Args:
+        path: Path of the queue without the job ID and extension.
+        domains: Domains to process.
+        costs: Estimated time to process each domain. Defaults to None, where all costs are 0.
+        task_id: SLURM_ARRAY_TASK_ID of this task. Defaults to 0.
+
+    Returns:
+        Tuple of (queue, owner), where owner is the unique name of this task for `claim_all`.
+    """
+    job_id = os.getenv("SLURM_ARRAY_JOB_ID")
+    queue = DomainQueue(f"{path}-{job_id}.db" if job_id is not None else ":memory:")
+    queue.put_once(domains, costs)
+    owner = f"{task_id}@{socket.gethostname()}:{os.getpid()}"
+
+    return queue, owner
+
+
+def report_abandoned(claim: Claim) -> None:
+    """
+    Print a domain abandoned by `claim_all` after its lease expired too many times (e.g., a task crashed on it).
+    """
+    print(f"Abandoned '{claim.domain}' after {claim.attempts} expired leases.")
@@ -0,0 +1,268 @@
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+import logging
+import threading
+import time
+
+from seleniumwire import webdriver
+
+import config
+import utils.firefox_profile as firefox_profile
+
+logger = logging.getLogger(config.LOGGER_NAME)
+
+# Clears cookies, storage, cache, service workers, HSTS, permissions, and history of all sites.
+# Runs in the chrome context, see https://searchfox.org/mozilla-central/source/toolkit/components/cleardata/nsIClearDataService.idl
+CLEAR_DATA_SCRIPT = """
+const callback = arguments[arguments.length - 1];
+Services.clearData.deleteData(Ci.nsIClearDataService.CLEAR_ALL, {
+    onDataDeleted(failedFlags) {
+        callback(failedFlags);
+    },
+});
+"""
+
+
+# Number of cookies left in the cookie jar of all sites
+COUNT_COOKIES_SCRIPT = "return Services.cookies.cookies.length;"
+
+
+def wait_for_network_idle(driver: webdriver.Firefox, quiet_time: float, timeout: float) -> bool:
+    """
+    Wait until the last request seen by the proxy was answered and no new request was sent for `quiet_time` seconds.
+
+    Args:
+        driver: The web driver.
+        quiet_time: Seconds without a new request.
+        timeout: Maximum seconds to wait.
+
+    Returns:
+        True iff the network became idle before the timeout.
+    """
+    deadline = time.time() + timeout
+    while True:
+        last_request = driver.last_request
+        if last_request is None or (
+            last_request.response is not None
+            and time.time() - last_request.date.timestamp() >= quiet_time
+        ):
+            return True
+        if time.time() >= deadline:
+            return False
+
+        time.sleep(0.1)
+
+
+def reset_driver(driver: webdriver.Firefox) -> bool:
+    """
+    Reset a web driver to the state of a freshly started driver.
+
+    Extra windows are closed, all site data is cleared once requests still in flight have
+    finished, and the captured requests (including the HAR log) and interceptors are removed.
+
+    Requires a driver started with `-remote-allow-system-access` (see Crawler.get_driver),
+    since site data is cleared in the chrome context.
+
+    Args:
+        driver: The web driver to reset.
+
+    Returns:
+        True iff the driver was reset. Otherwise, its state is unknown and it must be quit.
+    """
+    try:
+        # Stop all pages so that no site can write data after it is cleared
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+        driver.get("about:blank")
+
+        # A response that is still in flight (e.g., a beacon) could set a cookie after it is cleared
+        if not wait_for_network_idle(driver, config.READY_QUIET_TIME, config.RESET_IDLE_TIMEOUT):
+            logger.info(f"Network was not idle after {config.RESET_IDLE_TIMEOUT} seconds, clearing site data anyway.")
+
+        with driver.context(driver.CONTEXT_CHROME):
+            failed_flags = driver.execute_async_script(CLEAR_DATA_SCRIPT)
+            cookies = driver.execute_script(COUNT_COOKIES_SCRIPT)
+        if failed_flags:
+            logger.warning(f"Failed to clear site data (flags {failed_flags}).")
+            return False
+        if cookies:
+            logger.warning(f"{cookies} cookies remain after clearing site data.")
+            return False
+
+        del driver.requests
+        del driver.request_interceptor
+        del driver.response_interceptor
+    except Exception:  # skipcq: PYL-W0703
+        logger.warning("Failed to reset driver.", exc_info=True)
+        return False
+
+    return True
+
+
+class DriverPool:
+    """
+    Pool of warm web drivers.
+
+    Released drivers are reset (see `reset_driver`) and reused instead of starting a new
+    Firefox and seleniumwire proxy for every crawl. A driver that fails to reset is quit,
+    so every acquired driver has the isolation of a fresh driver.
+
+    With lookahead, the next driver is started on a helper thread as soon as a driver is
+    acquired, and discarded drivers are quit on the same thread. Acquiring the next driver
+    then only waits for a start that overlapped with the previous crawl.
+
+    The pool is thread-safe, so concurrent arms may share it (see Crawler.crawl_arms_lockstep).
+    """
+
+    def __init__(self, factory: Callable[[], webdriver.Firefox], size: int = 1, max_uses: int = 10, lookahead: bool = False) -> None:
+        """
+        Args:
+            factory: Function that starts a new web driver.
+            size: Maximum number of idle drivers kept in the pool, including a driver being prewarmed. Defaults to 1.
+            max_uses: Number of times a driver is used before it is quit, bounding memory leaked by Firefox. Defaults to 10.
+            lookahead: Whether to prewarm the next driver in the background. Defaults to False.
+        """
+        self.factory = factory
+        self.size = size
+        self.max_uses = max_uses
+
+        self.lock = threading.RLock()  # Reentrant, since close may run in a signal handler
+        self.drivers: dict[int, webdriver.Firefox] = {}  # id(driver) -> driver, for all drivers that were not quit
+        self.idle: list[webdriver.Firefox] = []
+        self.uses: dict[int, int] = {}  # id(driver) -> number of times the driver was acquired
+
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="driver-pool") if lookahead else None
+        self.warming: Future[webdriver.Firefox] | None = None  # Driver being started in the background
+
+    def prewarm(self) -> None:
+        """
+        Start a driver in the background unless lookahead is disabled or a driver is idle or already starting.
+        """
+        with self.lock:
+            if self.executor is None or self.idle or self.warming is not None:
+                return
+
+            self.warming = self.executor.submit(self.factory)
+
+    def acquire(self) -> webdriver.Firefox:
+        """
+        Return an idle or prewarmed driver, starting a new one if there is neither.
+        """
+        with self.lock:
+            driver = self.idle.pop() if self.idle else None
+            warming = None
+            if driver is None:
+                warming, self.warming = self.warming, None
+
+        if warming is not None:
+            try:
+                driver = warming.result()
+            except BaseException as e:  # skipcq: PYL-W0703
+                if not warming.done() or not isinstance(e, Exception):
+                    # Interrupted while waiting (e.g., PhaseTimeout)
+                    warming.add_done_callback(lambda future: future.exception() is None and self.quit(future.result()))
+                    raise
+
+                logger.warning("Failed to prewarm driver.", exc_info=True)
+
+        if driver is None:
+            driver = self.factory()
+
+        with self.lock:
+            self.drivers[id(driver)] = driver
+            self.uses[id(driver)] = self.uses.get(id(driver), 0) + 1
+
+        self.prewarm()
+
+        return driver
+
+    def release(self, driver: webdriver.Firefox) -> bool:
+        """
+        Reset a driver and return it to the pool.
+
+        The driver is quit instead if the pool is full, it was used `max_uses` times, or it failed to reset.
+
+        Args:
+            driver: An acquired driver.
+
+        Returns:
+            False iff the driver failed to reset.
+        """
+        with self.lock:
+            if id(driver) not in self.drivers or driver in self.idle:
+                return True
+
+            keep = len(self.idle) + (self.warming is not None) < self.size and self.uses[id(driver)] < self.max_uses
+
+        try:
+            reset = keep and reset_driver(driver)
+        except BaseException:
+            # Interrupted while resetting (e.g., PhaseTimeout), so its state is unknown
+            self.discard(driver)
+            raise
+
+        if reset:
+            with self.lock:
+                if len(self.idle) + (self.warming is not None) < self.size:
+                    self.idle.append(driver)
+                    return True
+
+        self.discard(driver)
+
+        return reset or not keep
+
+    def discard(self, driver: webdriver.Firefox) -> None:
+        """
+        Quit a driver without returning it to the pool (e.g., after a driver error).
+
+        Args:
+            driver: An acquired or idle driver.
+        """
+        with self.lock:
+            if self.drivers.pop(id(driver), None) is None:
+                return  # Already quit
+
+            if driver in self.idle:
+                self.idle.remove(driver)
+            self.uses.pop(id(driver), None)
+
+        if self.executor is not None:
+            self.executor.submit(self.quit, driver)
+        else:
+            self.quit(driver)
+
+    @staticmethod
+    def quit(driver: webdriver.Firefox) -> None:
+        """
+        Quit a driver and remove its cloned profile, if any (see Crawler.get_driver).
+        """
+        try:
+            driver.quit()
+        except Exception:  # skipcq: PYL-W0703
+            logger.warning("Failed to quit driver.", exc_info=True)
+
+        profile_path = getattr(driver, "profile_path", None)
+        if profile_path is not None:
+            firefox_profile.remove_profile(profile_path)
+
+    def close(self) -> None:
+        """
+        Quit all drivers of the pool, including acquired and prewarmed drivers.
+        """
+        for driver in list(self.drivers.values()):
+            self.discard(driver)
+
+        with self.lock:
+            warming, self.warming = self.warming, None
+        if warming is not None:
+            try:
+                self.quit(warming.result())
+            except Exception:  # skipcq: PYL-W0703
+                pass
+
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
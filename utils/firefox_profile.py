@@ -0,0 +1,152 @@
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+
+from filelock import FileLock
+from selenium import webdriver
+from selenium.webdriver import FirefoxOptions
+
+"""
+Template Firefox profile shared by all web drivers on a machine.
+
+A fresh profile makes Firefox create its databases, extension registry, and startup cache
+on every start. Instead, a template profile is built and warmed once, and each web driver
+starts from a copy-on-write clone of it (see `clone_profile`).
+"""
+
+# Written to user.js, so they are applied on every start of a clone
+# Only browser-level services are disabled. Nothing changes how websites are loaded.
+TEMPLATE_PREFS: dict[str, bool | int | str] = {
+    # Telemetry
+    "toolkit.telemetry.enabled": False,
+    "toolkit.telemetry.unified": False,
+    "toolkit.telemetry.archive.enabled": False,
+    "datareporting.healthreport.uploadEnabled": False,
+    "datareporting.policy.dataSubmissionEnabled": False,
+    "app.normandy.enabled": False,
+    "app.shield.optoutstudies.enabled": False,
+    "browser.ping-centre.telemetry": False,
+
+    # Updates
+    "app.update.auto": False,
+    "app.update.enabled": False,
+    "app.update.disabledForTesting": True,
+    "extensions.update.enabled": False,
+    "browser.search.update": False,
+    "browser.region.update.enabled": False,
+
+    # Safe Browsing
+    "browser.safebrowsing.malware.enabled": False,
+    "browser.safebrowsing.phishing.enabled": False,
+    "browser.safebrowsing.downloads.enabled": False,
+    "browser.safebrowsing.blockedURIs.enabled": False,
+    "browser.safebrowsing.provider.mozilla.updateURL": "",
+
+    # First-run and start pages
+    "browser.startup.homepage_override.mstone": "ignore",
+    "browser.startup.page": 0,
+    "browser.startup.firstrunSkipsHomepage": True,
+    "startup.homepage_welcome_url": "about:blank",
+    "startup.homepage_welcome_url.additional": "",
+    "browser.aboutwelcome.enabled": False,
+    "datareporting.policy.firstRunURL": "",
+    "browser.shell.checkDefaultBrowser": False,
+    "browser.newtabpage.enabled": False,
+    "network.captive-portal-service.enabled": False,
+    "network.connectivity-service.enabled": False,
+}
+
+# Runtime files that must not be copied into a clone
+RUNTIME_FILES = ["lock", ".parentlock", "parent.lock", "MarionetteActivePort"]
+
+READY = ".ready"  # Marks a complete template
+
+
+def write_user_prefs(path: str) -> None:
+    """
+    Write TEMPLATE_PREFS to the user.js of a profile.
+
+    Args:
+        path: Profile directory.
+    """
+    with open(os.path.join(path, "user.js"), "w") as file:
+        for name, value in TEMPLATE_PREFS.items():
+            file.write(f"user_pref({json.dumps(name)}, {json.dumps(value)});\n")
+
+
+def build_template(path: str, warm_time: float = 5) -> None:
+    """
+    Build and warm the template profile unless it already exists.
+
+    Concurrent workers on the same machine wait for the first worker to build it.
+
+    Args:
+        path: Directory of the template profile. Should be on local disk.
+        warm_time: Seconds Firefox runs to populate the profile. Defaults to 5.
+    """
+    if os.path.exists(os.path.join(path, READY)):
+        return
+
+    os.makedirs(os.path.dirname(path.rstrip("/")), exist_ok=True)
+    with FileLock(path.rstrip("/") + ".lock"):
+        if os.path.exists(os.path.join(path, READY)):
+            return
+
+        build_path = tempfile.mkdtemp(prefix="profile-", dir=os.path.dirname(path.rstrip("/")))
+        write_user_prefs(build_path)
+
+        # Let Firefox create its databases, extension registry, and startup cache
+        options = FirefoxOptions()
+        options.add_argument("--headless")
+        options.add_argument("-profile")
+        options.add_argument(build_path)
+        try:
+            driver = webdriver.Firefox(options=options)
+            try:
+                driver.get("about:blank")
+                time.sleep(warm_time)
+            finally:
+                driver.quit()
+        except BaseException:
+            shutil.rmtree(build_path, ignore_errors=True)
+            raise
+
+        for file in RUNTIME_FILES:
+            if os.path.lexists(os.path.join(build_path, file)):
+                os.remove(os.path.join(build_path, file))
+        write_user_prefs(build_path)  # Discard prefs written by geckodriver
+        open(os.path.join(build_path, READY), "w").close()
+
+        shutil.rmtree(path, ignore_errors=True)  # Incomplete template of a worker that crashed
+        os.rename(build_path, path)
+
+
+def clone_profile(template_path: str) -> str:
+    """
+    Clone the template profile for a new web driver.
+
+    On file systems with reflinks (e.g., Btrfs, XFS), the clone shares all blocks with the
+    template until they are written. Otherwise, the clone is a regular copy. Hard links are
+    not used, since Firefox modifies its databases in place.
+
+    Args:
+        template_path: Directory of the template profile, see `build_template`.
+
+    Returns:
+        Directory of the clone. Remove it with `remove_profile` once the web driver quits.
+    """
+    clone_path = tempfile.mkdtemp(prefix="clone-", dir=os.path.dirname(template_path.rstrip("/")))
+    subprocess.run(["cp", "-a", "--reflink=auto", f"{template_path.rstrip('/')}/.", clone_path], check=True)
+    os.remove(os.path.join(clone_path, READY))
+
+    return clone_path
+
+
+def remove_profile(path: str) -> None:
+    """
+    Remove a cloned profile.
+    """
+    shutil.rmtree(path, ignore_errors=True)
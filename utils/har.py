@@ -0,0 +1,104 @@
+from collections.abc import Iterable, Iterator
+import gzip
+import json
+import os
+from typing import IO
+
+"""
+Streaming reader and writer of HAR files.
+
+A HAR file is written as one compact JSON document with one entry per line, so that it
+remains a valid HAR file once decompressed and can be read one entry at a time:
+
+    {"log": {"version": "1.2", "creator": {...}, "entries": [
+    {...},
+    {...}
+    ]}}
+
+Files ending in '.gz' are compressed with gzip.
+"""
+
+CREATOR = {"name": "cookie-classify", "version": "1.0"}
+
+
+def open_har(path: str, mode: str) -> IO[str]:
+    """
+    Open a HAR file as text, compressed with gzip if it ends in '.gz'.
+
+    Args:
+        path: Path to the HAR file.
+        mode: "r" or "w".
+    """
+    if path.lower().endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8", compresslevel=6)
+    return open(path, mode, encoding="utf-8")
+
+
+def find_har(stem: str) -> str | None:
+    """
+    Return the path of a HAR file saved by a crawl, or None if it does not exist.
+
+    Crawls save HAR files as '.har.gz' (see Crawler.save_har), or as '.har' without compression.
+    Earlier crawls saved them as indented '.json' files, which are found as a fallback.
+
+    Args:
+        stem: Path to the HAR file without its extension (e.g., ".../0/normal").
+    """
+    for extension in (".har.gz", ".har", ".json"):
+        if os.path.isfile(stem + extension):
+            return stem + extension
+
+    return None
+
+
+def write_har(path: str, entries: Iterable[dict]) -> int:
+    """
+    Write HAR entries to a file one entry at a time.
+
+    The file is written to a temporary path and renamed, so a partial HAR file is never left behind.
+
+    Args:
+        path: Path to the HAR file. Compressed with gzip if it ends in '.gz'.
+        entries: HAR entries, e.g., from CaptureStorage.iter_har_entries (see utils/capture.py).
+
+    Returns:
+        Number of entries written.
+    """
+    count = 0
+    temp_path = os.path.join(os.path.dirname(path), ".tmp-" + os.path.basename(path))  # Keeps the extension
+    with open_har(temp_path, "w") as file:
+        header = json.dumps({"log": {"version": "1.2", "creator": CREATOR, "entries": []}})
+        file.write(header[:-len("]}}")] + "\n")
+        for entry in entries:
+            if count > 0:
+                file.write(",\n")
+            file.write(json.dumps(entry, separators=(",", ":")))
+            count += 1
+        file.write("\n]}}\n")
+    os.replace(temp_path, path)
+
+    return count
+
+
+def iter_har_entries(path: str) -> Iterator[dict]:
+    """
+    Return an iterator over the entries of a HAR file.
+
+    Files written by `write_har` are read lazily. Other HAR files (e.g., the indented '.json'
+    files of earlier crawls) are parsed in full before the first entry is returned.
+
+    Args:
+        path: Path to the HAR file. Decompressed with gzip if it ends in '.gz'.
+    """
+    with open_har(path, "r") as file:
+        header = file.readline()
+        if not header.rstrip().endswith('"entries": ['):
+            file.seek(0)
+            yield from json.load(file)["log"]["entries"]
+            return
+
+        for line in file:
+            line = line.rstrip().rstrip(",")
+            if line in ("", "]}}"):
+                continue
+            yield json.loads(line)
@@ -0,0 +1,150 @@
+import glob
+import json
+import os
+import re
+
+"""
+Registry of the JavaScript injections in injections/.
+
+Injections are referenced by file name (e.g., "clickable-elements.js") and loaded from disk
+once per process. Load them with `load_all` before starting workers, so that forked workers
+share the registry and a broken injection stops the crawl before any domain is claimed.
+
+An injection may include library files of the same directory (e.g., finder.js) by listing
+them in its doc comment, one per line, as ` * @requires <file>`. The required files are
+prepended to the injection, each at most once, before the injection is sent to the browser.
+
+Instead of sending its full source on every call, an injection may be installed once per
+document as a function of `window.__cc` (see `install_script` and `invoke_script`).
+"""
+
+DIRECTORY = "injections/"
+
+REQUIRES = re.compile(r"^\s*\*\s*@requires\s+(\S+)\s*$", re.MULTILINE)  # A line " * @requires <file>" of a doc comment
+BLOCK_COMMENT = re.compile(r"^\s*/\*(?:(?!\*/).)*\*/\s*$", re.MULTILINE | re.DOTALL)  # A block comment on its own lines
+LINE_COMMENT = re.compile(r"^\s*//.*$", re.MULTILINE)  # A line comment on its own line
+
+MISSING = "__cc:missing"  # Returned by `invoke_script` if the injection is not installed in the current document
+
+scripts: dict[str, str] = {}  # Name -> source with required files prepended
+
+
+def resolve(name: str, sources: list[str], loaded: set[str], loading: set[str]) -> None:
+    """
+    Append the sources of the required files of an injection, then of the injection itself.
+
+    Args:
+        name: File name of the injection.
+        sources: Sources in the order they are sent to the browser.
+        loaded: Names already appended to sources.
+        loading: Names whose required files are being resolved, to detect cycles.
+
+    Raises:
+        ValueError: If a required file does not exist or the required files form a cycle.
+    """
+    if name in loaded:
+        return
+    if name in loading:
+        raise ValueError(f"Injection '{name}' requires itself.")
+
+    path = os.path.join(DIRECTORY, name)
+    if not os.path.isfile(path):
+        raise ValueError(f"Injection '{name}' does not exist.")
+
+    with open(path, "r") as file:
+        source = file.read()
+
+    loading.add(name)
+    for required in REQUIRES.findall(source):
+        resolve(required, sources, loaded, loading)
+    loading.remove(name)
+
+    sources.append(source)
+    loaded.add(name)
+
+
+def minify(source: str) -> str:
+    """
+    Remove comments on their own lines, indentation, and blank lines from a script.
+
+    Comments after code are kept, since they cannot be told apart from strings without parsing.
+    Lines are matched without parsing too, so a comment-like line or indentation inside a
+    multi-line template literal is changed as well. Only minify injections without such literals.
+    """
+    source = BLOCK_COMMENT.sub("", source)
+    source = LINE_COMMENT.sub("", source)
+
+    return "\n".join(line.strip() for line in source.splitlines() if line.strip())
+
+
+def load(name: str, minified: bool = False) -> str:
+    """
+    Load an injection from disk with its required files prepended.
+
+    Args:
+        name: File name of the injection (e.g., "clickable-elements.js").
+        minified: Whether to minify the source, see `minify`. Defaults to False.
+
+    Raises:
+        ValueError: If the injection or a required file does not exist or the required files form a cycle.
+    """
+    sources: list[str] = []
+    resolve(name, sources, loaded=set(), loading=set())
+    source = "\n".join(sources)
+
+    return minify(source) if minified else source
+
+
+def load_all(minified: bool = False) -> None:
+    """
+    Load and validate every injection of DIRECTORY into the registry.
+
+    Args:
+        minified: Whether to minify the sources, see `minify`. Defaults to False.
+
+    Raises:
+        ValueError: If a required file does not exist or the required files of an injection form a cycle.
+    """
+    for path in sorted(glob.glob(os.path.join(DIRECTORY, "*.js"))):
+        name = os.path.basename(path)
+        scripts[name] = load(name, minified)
+
+
+def register(name: str, source: str) -> None:
+    """
+    Add a script that is not a file of DIRECTORY to the registry (e.g., a composite snapshot).
+    """
+    scripts[name] = source
+
+
+def get_script(name: str) -> str:
+    """
+    Return the source of an injection, loading it unless it is in the registry.
+
+    Args:
+        name: File name of the injection, or name of a registered script.
+    """
+    if name not in scripts:
+        scripts[name] = load(name)
+
+    return scripts[name]
+
+
+def install_script(name: str) -> str:
+    """
+    Return a script that installs an injection as `window.__cc[name]` and calls it with the script arguments.
+    """
+    return (
+        f"(window.__cc = window.__cc || {{}})[{json.dumps(name)}] = function () {{\n{get_script(name)}\n}};\n"
+        f"return window.__cc[{json.dumps(name)}].apply(null, arguments);\n"
+    )
+
+
+def invoke_script(name: str) -> str:
+    """
+    Return a script that calls an injection installed by `install_script`, or returns MISSING if it is not installed.
+    """
+    return (
+        f"if (window.__cc === undefined || !window.__cc.hasOwnProperty({json.dumps(name)})) return {json.dumps(MISSING)};\n"
+        f"return window.__cc[{json.dumps(name)}].apply(null, arguments);\n"
+    )
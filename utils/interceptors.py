@@ -1,4 +1,6 @@
 from typing import Optional
+import os
+import urllib.parse
 
 import seleniumwire.request
 
@@ -89,3 +91,59 @@ def set_referer_interceptor(request: seleniumwire.request.Request, url: str, ref
     if URL(request.url) == URL(url):
         del request.headers["Referer"]
         request.headers["Referer"] = referer
+
+
+# Resource type -> values of the Sec-Fetch-Dest request header, see https://fetch.spec.whatwg.org/#concept-request-destination
+RESOURCE_DESTINATIONS: dict[str, tuple[str, ...]] = {
+    "image": ("image",),
+    "media": ("audio", "video", "track"),
+    "font": ("font",),
+    "style": ("style",),
+    "script": ("script",),
+}
+
+# Resource type -> URL extensions, used if the destination is not sent or is ambiguous (e.g., "empty" for fetch)
+RESOURCE_EXTENSIONS: dict[str, tuple[str, ...]] = {
+    "image": (".png", ".jpg", ".jpeg", ".gif", ".webp", ".avif", ".svg", ".ico", ".bmp"),
+    "media": (".mp4", ".webm", ".ogg", ".ogv", ".mp3", ".wav", ".m4a", ".m4s", ".ts", ".m3u8", ".mpd", ".vtt"),
+    "font": (".woff", ".woff2", ".ttf", ".otf", ".eot"),
+    "style": (".css",),
+    "script": (".js", ".mjs"),
+}
+
+
+def get_resource_type(request: seleniumwire.request.Request) -> Optional[str]:
+    """
+    Return the resource type of a request (see RESOURCE_DESTINATIONS), or None if it is of no listed type.
+
+    Args:
+        request: The request to classify.
+    """
+    destination = request.headers.get("Sec-Fetch-Dest")
+    for resource_type, destinations in RESOURCE_DESTINATIONS.items():
+        if destination in destinations:
+            return resource_type
+
+    if destination not in (None, "", "empty"):
+        return None  # e.g., "document" or "iframe" are never classified by extension
+
+    extension = os.path.splitext(urllib.parse.urlsplit(request.url).path)[1].lower()
+    for resource_type, extensions in RESOURCE_EXTENSIONS.items():
+        if extension in extensions:
+            return resource_type
+
+    return None
+
+
+def block_resource_interceptor(request: seleniumwire.request.Request, blocked: tuple[str, ...]) -> None:
+    """
+    Answer requests for blocked resource types with an empty response instead of fetching them.
+
+    Only use this interceptor in sessions whose requests are not measured (e.g., resolving a domain).
+
+    Args:
+        request: The request to modify.
+        blocked: Resource types to block, see RESOURCE_DESTINATIONS.
+    """
+    if get_resource_type(request) in blocked:
+        request.create_response(status_code=204, headers={"Content-Length": "0"}, body=b"")
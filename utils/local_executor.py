@@ -0,0 +1,105 @@
+import os
+import subprocess
+import time
+from typing import Optional
+
+import utils.slurm as slurm
+
+# Stand-in for `sbatch --array` that runs every task of an array on the current machine.
+# Each task sees the same SLURM_* environment variables it would see under SLURM.
+
+
+def parse_array(jobs: str) -> list[int]:
+    """
+    Parse a SLURM array specification.
+
+    Supports ranges (1-25), lists (0-24,30), and steps (0-24:2). A concurrency
+    limit (%N) is ignored, since concurrency is capped by the available resources.
+
+    Args:
+        jobs: Array specification, e.g. "1-25".
+
+    Returns:
+        Sorted task IDs.
+    """
+    task_ids: set[int] = set()
+    for part in jobs.split("%")[0].split(","):
+        part, _, step = part.partition(":")
+        start, _, end = part.partition("-")
+        task_ids.update(range(int(start), int(end or start) + 1, int(step or 1)))
+
+    return sorted(task_ids)
+
+
+def local_run(command: str, job_name: str, jobs: str, memory: int, cpus: int, output_path: Optional[str] = None) -> dict[int, int]:
+    """
+    Run an array of tasks as local processes and wait for all of them to exit.
+
+    As many tasks run concurrently as fit in the cores and memory of the machine.
+
+    Args:
+        command: The command to run.
+        job_name: The name of the job.
+        jobs: The tasks to run. Must be in array format (e.g. 1-25).
+        memory: The amount of memory (GB) to allocate to each cpu.
+        cpus: The number of cpus to allocate to each task.
+        output_path: Directory for the output of each task. Defaults to None, where output is discarded.
+
+    Returns:
+        Map of task ID to exit status. Negative statuses are the signal that killed the task.
+    """
+    GB = 1024 ** 3
+
+    task_ids = parse_array(jobs)
+    concurrency = max(1, min(slurm.get_cpus() // cpus, slurm.get_memory() // (memory * cpus * GB)))
+    job_id = str(os.getpid())
+    print(f"Running {len(task_ids)} tasks of '{job_name}' locally, {concurrency} at a time.")
+
+    if output_path is not None:
+        os.makedirs(output_path, exist_ok=True)
+
+    pending = list(reversed(task_ids))
+    running: dict[int, subprocess.Popen] = {}
+    statuses: dict[int, int] = {}
+    try:
+        while pending or running:
+            while pending and len(running) < concurrency:
+                task_id = pending.pop()
+                env = os.environ | {
+                    "SLURM_JOB_NAME": job_name,
+                    "SLURM_ARRAY_JOB_ID": job_id,
+                    "SLURM_ARRAY_TASK_ID": str(task_id),
+                    "SLURM_CPUS_PER_TASK": str(cpus),
+                    "SLURM_MEM_PER_CPU": str(memory * 1024),  # MB
+                }
+                env.pop("SLURM_MEM_PER_NODE", None)
+
+                if output_path is None:
+                    stdout = subprocess.DEVNULL
+                else:
+                    stdout = open(os.path.join(output_path, f"{job_name}-{job_id}_{task_id}.out"), "w")
+                running[task_id] = subprocess.Popen(command, shell=True, env=env, stdout=stdout, stderr=subprocess.STDOUT)
+                if output_path is not None:
+                    stdout.close()  # type: ignore
+
+            time.sleep(1)
+
+            for task_id, process in list(running.items()):
+                status = process.poll()
+                if status is None:
+                    continue
+
+                statuses[task_id] = status
+                del running[task_id]
+                print(f"Task {task_id} exited with status {status}.")
+    except KeyboardInterrupt:
+        print("Interrupted, terminating running tasks.")
+        for process in running.values():
+            process.terminate()
+        for task_id, process in running.items():
+            statuses[task_id] = process.wait()
+
+    failed = [task_id for task_id, status in statuses.items() if status != 0]
+    print(f"Completed {len(statuses)}/{len(task_ids)} tasks, {len(failed)} failed{f': {failed}' if failed else ''}.")
+
+    return statuses
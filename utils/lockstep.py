@@ -0,0 +1,64 @@
+from threading import BrokenBarrierError, Condition
+
+
+class LockStep:
+    """
+    Reusable barrier for threads that advance in lock-step.
+
+    Unlike threading.Barrier, a thread may leave at any time (e.g., when its
+    traversal fails), after which the remaining threads continue without it.
+    """
+
+    def __init__(self, parties: int) -> None:
+        """
+        Args:
+            parties: Number of threads that must call `wait` before any of them continues.
+        """
+        self.parties = parties
+        self.waiting = 0
+        self.generation = 0  # Incremented each time the waiting threads are released
+        self.aborted = False
+        self.condition = Condition()
+
+    def wait(self) -> None:
+        """
+        Wait until every thread that has not left is waiting.
+
+        Raises:
+            BrokenBarrierError: If the barrier was aborted.
+        """
+        with self.condition:
+            if self.aborted:
+                raise BrokenBarrierError
+
+            generation = self.generation
+            self.waiting += 1
+            if self.waiting >= self.parties:
+                self.advance()
+                return
+
+            self.condition.wait_for(lambda: self.generation != generation or self.aborted)
+            if self.generation == generation:
+                raise BrokenBarrierError
+
+    def leave(self) -> None:
+        """
+        Stop participating, releasing the other threads if they are all waiting.
+        """
+        with self.condition:
+            self.parties -= 1
+            if self.waiting and self.waiting >= self.parties:
+                self.advance()
+
+    def abort(self) -> None:
+        """
+        Release all waiting threads with BrokenBarrierError, now and in any later `wait`.
+        """
+        with self.condition:
+            self.aborted = True
+            self.condition.notify_all()
+
+    def advance(self) -> None:
+        self.waiting = 0
+        self.generation += 1
+        self.condition.notify_all()
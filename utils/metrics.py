@@ -0,0 +1,130 @@
+from collections import Counter
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, Iterable
+import os
+import time
+
+# Result flags that count as a failed crawl, see CrawlResults
+FAILURES = ["landing_page_down", "unexpected_exception", "SIGTERM", "SIGKILL", "lease_expired"]
+
+
+def get_rss(pid: int) -> int:
+    """
+    Return the resident set size (bytes) of a process and all of its descendants.
+
+    Processes that exit while being read are ignored.
+
+    Args:
+        pid: Root of the process tree.
+    """
+    rss = 0
+    try:
+        with open(f"/proc/{pid}/status") as file:
+            for line in file:
+                if line.startswith("VmRSS:"):
+                    rss += int(line.split()[1]) * 1024
+                    break
+
+        children: list[int] = []
+        for task in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{task}/children") as file:
+                children.extend(int(child) for child in file.read().split())
+    except (FileNotFoundError, ProcessLookupError):
+        return rss
+
+    return rss + sum(get_rss(child) for child in children)
+
+
+def escape(value: Any) -> str:
+    """
+    Escape a Prometheus label value.
+    """
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class CrawlMetrics:
+    """
+    Throughput and health metrics of a crawl task.
+
+    Metrics are written in the Prometheus text format, so the directory can be scraped
+    by the textfile collector of node_exporter or read directly with `cat`.
+    """
+
+    def __init__(self, path: str, task_id: int) -> None:
+        """
+        Args:
+            path: Path to the metrics file. Should end with `.prom`.
+            task_id: ID of the task, added as the `task` label of every metric.
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.task_id = task_id
+
+        self.start_time = time.time()
+        self.domains = 0
+        self.actions = 0
+        self.driver_restarts = 0
+        self.driver_reset_failures = 0
+        self.failures: Counter[str] = Counter({failure: 0 for failure in FAILURES})
+
+    def record(self, result: Mapping[str, Any]) -> None:
+        """
+        Record the result of a finished crawl.
+
+        Args:
+            result: Results of the crawl.
+        """
+        self.domains += 1
+        self.actions += sum(len(clickstream) + 1 for clickstream in result.get("clickstream", [])) - result.get("resumed_actions", 0)
+        self.driver_restarts += result.get("driver_restarts", 0)
+        self.driver_reset_failures += result.get("driver_reset_failures", 0)
+        for failure in FAILURES:
+            if result.get(failure):
+                self.failures[failure] += 1
+
+    def write(self, in_flight: Iterable[tuple[str, float, int]]) -> None:
+        """
+        Replace the metrics file with the current metrics.
+
+        The file is replaced atomically, so a scraper never reads a partial file.
+
+        Args:
+            in_flight: (domain, start time, pid) of each running crawl.
+        """
+        task = f'task="{self.task_id}"'
+        hours = max(time.time() - self.start_time, 1) / 3600
+
+        lines: list[str] = []
+        def metric(name: str, type: str, help: str, samples: Iterable[tuple[str, float]]) -> None:
+            lines.append(f"# HELP cookie_crawl_{name} {help}")
+            lines.append(f"# TYPE cookie_crawl_{name} {type}")
+            for labels, value in samples:
+                lines.append(f"cookie_crawl_{name}{{{labels}}} {value}")
+
+        metric("domains_total", "counter", "Domains finished by the task.", [(task, self.domains)])
+        metric("actions_total", "counter", "Actions collected by the task.", [(task, self.actions)])
+        metric("domains_per_hour", "gauge", "Domains finished per hour since the task started.", [(task, self.domains / hours)])
+        metric("actions_per_hour", "gauge", "Actions collected per hour since the task started.", [(task, self.actions / hours)])
+        metric("failures_total", "counter", "Finished domains by failure category.", [
+            (f'{task},category="{failure}"', count) for failure, count in self.failures.items()
+        ])
+        metric("driver_restarts_total", "counter", "Web drivers restarted after an error or timeout.", [(task, self.driver_restarts)])
+        metric("driver_reset_failures_total", "counter", "Released web drivers quit since they failed to reset.", [(task, self.driver_reset_failures)])
+
+        in_flight = list(in_flight)
+        now = time.time()
+        metric("in_flight", "gauge", "Domains currently being crawled.", [(task, len(in_flight))])
+        metric("in_flight_seconds", "gauge", "Time since the crawl of each in-flight domain started.", [
+            (f'{task},domain="{escape(domain)}"', now - start_time) for domain, start_time, _ in in_flight
+        ])
+        metric("in_flight_rss_bytes", "gauge", "Resident memory of each in-flight crawl, including its browser.", [
+            (f'{task},domain="{escape(domain)}"', get_rss(pid)) for domain, _, pid in in_flight
+        ])
+        metric("rss_bytes", "gauge", "Resident memory of the task, including all crawls.", [(task, get_rss(os.getpid()))])
+        metric("last_update_seconds", "gauge", "Time the metrics were last written.", [(task, now)])
+
+        temp_path = self.path.with_suffix(".tmp")
+        with open(temp_path, "w") as file:
+            file.write("\n".join(lines) + "\n")
+        os.replace(temp_path, self.path)
@@ -0,0 +1,114 @@
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
+import functools
+import http.client
+import socket
+import ssl
+import urllib.error
+import urllib.request
+
+# Pre-flight check of which URLs of a domain answer over plain HTTP.
+# A browser is only started for domains with at least one answering URL.
+
+USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64; rv:109.0) Gecko/20100101 Firefox/115.0"
+
+# getaddrinfo errors for host names that do not exist or have no address, as opposed to, e.g., EAI_AGAIN
+NONEXISTENT_HOST_ERRORS = {socket.EAI_NONAME, getattr(socket, "EAI_NODATA", socket.EAI_NONAME)}
+
+
+class Outcome(str, Enum):
+    """
+    Outcome of probing a URL.
+    """
+
+    ANSWERED = "answered"  # Any answer at the HTTP level, including error statuses, see probe_url
+    UNRESOLVED = "unresolved"  # The host name does not exist (e.g., NXDOMAIN)
+    REFUSED = "refused"  # The host refused the connection
+    FAILED = "failed"  # Any other failure to connect (e.g., a timeout), which may be transient
+
+
+DETERMINISTIC = (Outcome.UNRESOLVED, Outcome.REFUSED)  # Failures that retrying soon would not change
+
+
+def get_candidate_urls(domain: str) -> list[str]:
+    """
+    Return the URLs a domain may resolve to, in order of preference.
+    """
+    return [f"https://{domain}", f"https://www.{domain}", f"http://{domain}", f"http://www.{domain}"]
+
+
+def unreachable(outcomes: Iterable[str]) -> bool:
+    """
+    Return whether a domain is unreachable, i.e., every candidate URL failed deterministically.
+
+    Args:
+        outcomes: Outcome of each candidate URL (e.g., the values of `probe_domain`, or of
+            `probe_outcomes` in the results of a crawl).
+    """
+    outcomes = list(outcomes)
+    return len(outcomes) > 0 and all(outcome in DETERMINISTIC for outcome in outcomes)
+
+
+class NoRedirect(urllib.request.HTTPRedirectHandler):
+    """
+    Redirect handler that does not follow redirects, so a redirect is raised as an HTTPError.
+    """
+
+    def redirect_request(self, *args, **kwargs) -> None:
+        return None
+
+
+def probe_url(url: str, timeout: float) -> Outcome:
+    """
+    Return whether a URL answers at the HTTP level, or why not.
+
+    Any answer of the server counts, since the page may still load in a browser: error statuses
+    (e.g., 403 from bot protection), redirects (which are not followed), malformed responses,
+    and a connection that is dropped or stalls once the request was sent. Only failures to
+    resolve the host, connect, or send the request count as failures. Certificate errors are
+    ignored, as they are by the crawler's proxy.
+
+    Args:
+        url: URL to request.
+        timeout: Seconds to wait for each connection and response.
+    """
+    context = ssl.create_default_context()
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_NONE
+    opener = urllib.request.build_opener(NoRedirect(), urllib.request.HTTPSHandler(context=context))
+
+    request = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
+    try:
+        with opener.open(request, timeout=timeout):
+            return Outcome.ANSWERED  # Only the headers are read
+    except urllib.error.HTTPError:
+        return Outcome.ANSWERED
+    except urllib.error.URLError as e:  # Raised before the request was sent, e.g., DNS failure or refused connection
+        if isinstance(e.reason, socket.gaierror) and e.reason.errno in NONEXISTENT_HOST_ERRORS:
+            return Outcome.UNRESOLVED
+        if isinstance(e.reason, ConnectionRefusedError):
+            return Outcome.REFUSED
+        return Outcome.FAILED
+    except (OSError, http.client.HTTPException):  # Raised after the request was sent, e.g., RemoteDisconnected
+        return Outcome.ANSWERED
+    except ValueError:  # e.g., an invalid URL
+        return Outcome.FAILED
+
+
+def probe_domain(domain: str, timeout: float = 15) -> dict[str, Outcome]:
+    """
+    Probe all candidate URLs of a domain concurrently.
+
+    Args:
+        domain: Domain to probe.
+        timeout: Seconds to wait for each URL. Defaults to 15.
+
+    Returns:
+        The outcome of each candidate URL, in order of preference (see `get_candidate_urls`).
+    """
+    urls = get_candidate_urls(domain)
+    with ThreadPoolExecutor(max_workers=len(urls)) as executor:
+        outcomes = list(executor.map(functools.partial(probe_url, timeout=timeout), urls))
+
+    return dict(zip(urls, outcomes))
@@ -0,0 +1,108 @@
+from typing import Iterable, NamedTuple, Optional
+import sqlite3
+import time
+
+
+class Resolution(NamedTuple):
+    """
+    A cached domain -> URL resolution.
+    """
+
+    url: str | None  # None if the landing page was down
+    resolved_at: float  # Time the domain was resolved
+
+
+class ResolutionCache:
+    """
+    Persistent cache of domain -> URL resolutions backed by SQLite.
+
+    The cache is shared by all crawls, so repeated crawls of a site list skip resolving
+    domains that were resolved recently. Domains that could not be resolved may be cached
+    as negative entries with a shorter time to live (see Crawler.resolve_url).
+
+    NOTE: As with DomainQueue, only use `journal_mode="WAL"` if the cache is on node-local storage.
+    """
+
+    def __init__(self, path: str, ttl: float, negative_ttl: float, timeout: float = 60, journal_mode: str = "DELETE") -> None:
+        """
+        Args:
+            path: Path to the SQLite database. Created if it does not exist.
+            ttl: Seconds a resolved URL is valid.
+            negative_ttl: Seconds a domain whose landing page was down is skipped.
+            timeout: Seconds to wait for a competing transaction to finish. Defaults to 60.
+            journal_mode: SQLite journal mode. Defaults to "DELETE".
+        """
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+
+        self.connection = sqlite3.connect(path, timeout=timeout)
+        self.connection.execute(f"PRAGMA journal_mode={journal_mode}")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS resolutions ("
+            "domain TEXT PRIMARY KEY, "
+            "url TEXT, "  # NULL if the landing page was down
+            "resolved_at REAL NOT NULL"
+            ")"
+        )
+        self.connection.commit()
+
+    def get(self, domain: str) -> Optional[Resolution]:
+        """
+        Return the cached resolution of a domain.
+
+        Args:
+            domain: Domain to look up.
+
+        Returns:
+            The resolution, or None if the domain is not cached or its entry expired.
+        """
+        row = self.connection.execute("SELECT url, resolved_at FROM resolutions WHERE domain = ?", (domain,)).fetchone()
+        if row is None:
+            return None
+
+        resolution = Resolution(*row)
+        ttl = self.ttl if resolution.url is not None else self.negative_ttl
+        if time.time() - resolution.resolved_at > ttl:
+            return None
+
+        return resolution
+
+    def put(self, domain: str, url: str | None, resolved_at: Optional[float] = None) -> None:
+        """
+        Cache the resolution of a domain unless a newer resolution is cached.
+
+        Args:
+            domain: Resolved domain.
+            url: URL the domain resolved to, or None if the landing page was down.
+            resolved_at: Time the domain was resolved. Defaults to None, where the current time is used.
+        """
+        self.seed([(domain, url, resolved_at or time.time())])
+
+    def seed(self, resolutions: Iterable[tuple[str, str | None, float]]) -> None:
+        """
+        Cache many resolutions at once, keeping the newest resolution of each domain.
+
+        Args:
+            resolutions: Tuples of (domain, url, resolved_at), see `put`.
+        """
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO resolutions (domain, url, resolved_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (domain) DO UPDATE SET url = excluded.url, resolved_at = excluded.resolved_at "
+                "WHERE excluded.resolved_at > resolutions.resolved_at",
+                resolutions
+            )
+
+    def invalidate(self, domain: str, url: str | None) -> None:
+        """
+        Remove the cached resolution of a domain unless it was replaced by another crawl.
+
+        Args:
+            domain: Resolved domain.
+            url: The cached URL that turned out to be wrong.
+        """
+        with self.connection:
+            self.connection.execute("DELETE FROM resolutions WHERE domain = ? AND url IS ?", (domain, url))
+
+    def close(self) -> None:
+        self.connection.close()
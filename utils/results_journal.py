@@ -0,0 +1,174 @@
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional
+import json
+import os
+import time
+
+
+class ResultsJournal:
+    """
+    Append-only JSON Lines journal of crawl results.
+
+    Each task owns its own journal, so appending a result never requires a lock
+    and never rewrites previous results. Use `load_results` to merge all journals
+    into a single `dict[str, CrawlResults]` view.
+    """
+
+    def __init__(self, path: str | Path, encoder: type[json.JSONEncoder] = json.JSONEncoder) -> None:
+        """
+        Args:
+            path: Path to the journal file. Created if it does not exist.
+            encoder: JSON encoder used to serialize results. Defaults to json.JSONEncoder.
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.encoder = encoder
+
+        # Terminate a line left truncated by a task that was killed mid-write
+        if self.path.is_file() and self.path.stat().st_size > 0:
+            with open(self.path, "rb+") as file:
+                file.seek(-1, os.SEEK_END)
+                if file.read(1) != b"\n":
+                    file.write(b"\n")
+
+    def append(self, domain: str, result: Mapping[str, Any]) -> None:
+        """
+        Append the result for a domain to the journal.
+
+        The line is flushed and synced before returning, so a crashed task loses at most
+        the result it was writing.
+
+        Args:
+            domain: Domain that was crawled.
+            result: Results of the crawl.
+        """
+        line = json.dumps({"domain": domain, "timestamp": time.time(), "result": result}, cls=self.encoder)
+
+        with open(self.path, "a") as file:
+            file.write(line + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+
+
+def iter_journal(journal_path: str | Path) -> Iterator[tuple[str, float, dict]]:
+    """
+    Stream entries from every journal in a directory.
+
+    Truncated lines (e.g., from a task killed mid-write) are skipped.
+
+    Args:
+        journal_path: Directory containing `*.jsonl` journals.
+
+    Returns:
+        Iterator of (domain, timestamp, result) tuples.
+    """
+    journal_path = Path(journal_path)
+    if not journal_path.is_dir():
+        return
+
+    for journal in sorted(journal_path.glob("*.jsonl")):
+        with open(journal) as file:
+            for line in file:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+                yield entry["domain"], entry["timestamp"], entry["result"]
+
+
+def load_results(results_path: str | Path, journal_path: Optional[str | Path] = None) -> dict[str, dict]:
+    """
+    Return the merged `dict[str, CrawlResults]` view of a crawl.
+
+    Compacted results in `results_path` are loaded first and then overlaid with
+    journal entries. If a domain was crawled more than once, the latest entry wins.
+
+    Args:
+        results_path: Path to the compacted results.json. Ignored if it does not exist.
+        journal_path: Directory containing the journals. Defaults to None, where only results.json is read.
+
+    Returns:
+        Map of domain to crawl results.
+    """
+    results: dict[str, dict] = {}
+    if Path(results_path).is_file():
+        with open(results_path) as file:
+            results = json.load(file)
+
+    if journal_path is None:
+        return results
+
+    timestamps: dict[str, float] = {}
+    for domain, timestamp, result in iter_journal(journal_path):
+        if timestamp >= timestamps.get(domain, 0):
+            timestamps[domain] = timestamp
+            results[domain] = result
+
+    return results
+
+
+def iter_history(paths: Iterable[str]) -> Iterator[tuple[str, float, dict]]:
+    """
+    Stream the results of several crawls with the time each result was saved.
+
+    Compacted results do not record when each domain was crawled, so they are
+    timestamped with the modification time of results.json.
+
+    Args:
+        paths: Crawl directories (e.g., `config.DATA_PATH` of each crawl).
+
+    Returns:
+        Iterator of (domain, timestamp, result) tuples.
+    """
+    for path in paths:
+        results_path = Path(f"{path}results.json")
+        if results_path.is_file():
+            timestamp = results_path.stat().st_mtime
+            with open(results_path) as file:
+                for domain, result in json.load(file).items():
+                    yield domain, timestamp, result
+
+        yield from iter_journal(f"{path}results/")
+
+
+def load_history(paths: Iterable[str]) -> dict[str, dict]:
+    """
+    Return the merged results of several crawls.
+
+    Args:
+        paths: Crawl directories (e.g., `config.DATA_PATH` of each crawl). Later crawls take precedence.
+
+    Returns:
+        Map of domain to crawl results.
+    """
+    results: dict[str, dict] = {}
+    for path in paths:
+        results.update(load_results(f"{path}results.json", f"{path}results/"))
+
+    return results
+
+
+def compact_results(results_path: str | Path, journal_path: str | Path) -> int:
+    """
+    Merge all journals into results.json.
+
+    The file is replaced atomically, so readers never observe a partial write.
+    Journals are left untouched and may be compacted again at any time.
+
+    Args:
+        results_path: Path to the compacted results.json.
+        journal_path: Directory containing the journals.
+
+    Returns:
+        Number of domains in the compacted results.
+    """
+    results = load_results(results_path, journal_path)
+
+    temp_path = f"{results_path}.tmp"
+    with open(temp_path, "w") as file:
+        json.dump(results, file)
+    os.replace(temp_path, results_path)
+
+    return len(results)
@@ -0,0 +1,47 @@
+import os
+
+# Helpers for reading the resources SLURM allocated to the current task.
+# Outside of SLURM, the resources of the current machine are used instead.
+
+
+def get_cpus() -> int:
+    """
+    Return the number of CPUs available to the current task.
+    """
+    cpus = os.getenv("SLURM_CPUS_PER_TASK")
+    if cpus is not None:
+        return int(cpus)
+
+    return len(os.sched_getaffinity(0))
+
+
+def get_memory() -> int:
+    """
+    Return the memory (bytes) available to the current task.
+    """
+    MB = 1024 ** 2
+
+    mem_per_node = os.getenv("SLURM_MEM_PER_NODE")
+    if mem_per_node is not None:
+        return int(mem_per_node) * MB
+
+    mem_per_cpu = os.getenv("SLURM_MEM_PER_CPU")
+    if mem_per_cpu is not None:
+        return int(mem_per_cpu) * MB * get_cpus()
+
+    return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+
+
+def get_workers(cpus_per_worker: float, memory_per_worker: int, reserved_memory: int = 0) -> int:
+    """
+    Return the number of concurrent workers that fit in the current allocation.
+
+    Args:
+        cpus_per_worker: CPUs needed by each worker.
+        memory_per_worker: Memory (bytes) needed by each worker.
+        reserved_memory: Memory (bytes) needed besides the workers (e.g., by a spare worker). Defaults to 0.
+
+    Returns:
+        Number of workers, at least 1.
+    """
+    return max(1, min(int(get_cpus() // cpus_per_worker), (get_memory() - reserved_memory) // memory_per_worker))
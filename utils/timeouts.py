@@ -0,0 +1,119 @@
+from collections.abc import Mapping
+from typing import Any, Optional, TypedDict
+import statistics
+
+
+class PhaseBudgets(TypedDict, total=False):
+    """
+    Time budget (seconds) for each phase of a crawl.
+
+    A missing phase is not limited.
+    """
+
+    resolution: float  # Domain -> URL resolution
+    clickstream: float  # All arms of a single clickstream
+    arm: float  # A single baseline/control/experimental traversal
+    total: float  # Entire crawl, enforced by the supervisor in main.py
+
+
+class TimeoutModel:
+    """
+    Predict time budgets for a crawl from the durations of previous crawls.
+
+    Each budget is a high quantile of the observed durations multiplied by a safety margin.
+    Phase durations are read from `phase_times` when results have them. Otherwise, the
+    duration of an arm is estimated from `total_time` and the number of clickstreams.
+    """
+
+    def __init__(
+            self,
+            results: Mapping[str, Mapping[str, Any]],
+            total_actions: int,
+            default_timeout: float,
+            min_timeout: float,
+            max_timeout: float,
+            quantile: float = 0.99,
+            margin: float = 1.5,
+            min_samples: int = 20,
+    ) -> None:
+        """
+        Args:
+            results: Map of domain to previous crawl results.
+            total_actions: Number of actions each crawl will collect.
+            default_timeout: Total budget used until enough samples are available.
+            min_timeout: Lower bound on every budget.
+            max_timeout: Upper bound on every budget.
+            quantile: Quantile of observed durations to use. Defaults to 0.99.
+            margin: Multiplier applied to the quantile. Defaults to 1.5.
+            min_samples: Number of samples needed to predict a budget. Defaults to 20.
+        """
+        self.results = results
+        self.total_actions = total_actions
+        self.default_timeout = default_timeout
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.quantile = quantile
+        self.margin = margin
+        self.min_samples = min_samples
+
+        samples: dict[str, list[float]] = {"resolution": [], "clickstream": [], "arm": []}
+        seconds_per_action: list[float] = []
+        for result in results.values():
+            if not result.get("url") or result.get("SIGTERM") or result.get("SIGKILL") or result.get("unexpected_exception"):
+                continue
+
+            phase_times = result.get("phase_times")
+            if phase_times:
+                for phase, durations in samples.items():
+                    durations.extend(phase_times.get(phase, []))
+            elif result.get("clickstream"):
+                # Estimate from one resolution session and three arms per clickstream
+                durations = samples["arm"]
+                durations.append(result["total_time"] / (3 * len(result["clickstream"]) + 1))
+
+            actions = sum(len(clickstream) + 1 for clickstream in result.get("clickstream", []))
+            if actions > 0 and result.get("total_time"):
+                seconds_per_action.append(result["total_time"] / actions)
+
+        self.phases: PhaseBudgets = {}
+        for phase, durations in samples.items():
+            budget = self.predict(durations)
+            if budget is not None:
+                self.phases[phase] = budget  # type: ignore
+
+        self.total = self.predict([seconds * total_actions for seconds in seconds_per_action]) or default_timeout
+
+    def predict(self, durations: list[float]) -> Optional[float]:
+        """
+        Return the budget for a list of observed durations.
+
+        Returns:
+            The clamped budget, or None if there are fewer than `min_samples` durations.
+        """
+        if len(durations) < max(self.min_samples, 2):
+            return None
+
+        cut = statistics.quantiles(durations, n=100, method="inclusive")[round(self.quantile * 100) - 1]
+        return self.clamp(cut * self.margin)
+
+    def clamp(self, budget: float) -> float:
+        return min(self.max_timeout, max(self.min_timeout, budget))
+
+    def budgets(self, domain: str) -> PhaseBudgets:
+        """
+        Return the time budgets for crawling a domain.
+
+        If the domain was crawled before, its total budget is at least the previous
+        crawl time multiplied by the margin, so slow sites get more time on a retry.
+
+        Args:
+            domain: Domain to crawl.
+        """
+        budgets = PhaseBudgets(**self.phases)
+        budgets["total"] = self.total
+
+        previous = self.results.get(domain)
+        if previous and previous.get("total_time"):
+            budgets["total"] = self.clamp(max(self.total, previous["total_time"] * self.margin))
+
+        return budgets